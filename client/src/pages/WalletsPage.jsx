@@ -7,6 +7,8 @@ import FuturisticPage from '../components/Layout/FuturisticPage';
 const WalletRiskPage = () => {
   const [walletAddress, setWalletAddress] = useState('');
   const [report, setReport] = useState('');
+  const [assessment, setAssessment] = useState(null);
+  const [isLoadingReport, setIsLoadingReport] = useState(false);
   const [step, setStep] = useState('input'); // input, analyzing, result
   const [bufferText, setBufferText] = useState('');
   const [bufferIndex, setBufferIndex] = useState(0);
@@ -38,6 +40,26 @@ const WalletRiskPage = () => {
     }
   }, [bufferIndex, isBuffering]);
 
+  const requestScore = async (withReport) => {
+    const response = await fetch('http://localhost:8000/wallet_score', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ wallet_address: walletAddress, report: withReport }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+    if (data.error) {
+      throw new Error(data.error);
+    }
+    return data;
+  };
+
   const handleAnalyze = async () => {
     if (!walletAddress.trim()) {
       alert('Please enter a valid wallet address');
@@ -47,22 +69,14 @@ const WalletRiskPage = () => {
     setStep('analyzing');
     setIsBuffering(true);
     setReport('');
+    setAssessment(null);
 
     try {
-      const response = await fetch('http://localhost:8000/wallet_score', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ wallet_address: walletAddress }),
-      });
-
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-
-      const data = await response.json();
-      setReport(data.report);
+      // Rule-based score first; the detailed LLM report is requested on demand
+      // (the server adds it by itself when the rules are ambiguous)
+      const data = await requestScore(false);
+      setAssessment(data);
+      setReport(data.report || '');
       setIsBuffering(false);
       setStep('result');
     } catch (error) {
@@ -73,9 +87,24 @@ const WalletRiskPage = () => {
     }
   };
 
+  const handleRequestReport = async () => {
+    setIsLoadingReport(true);
+    try {
+      const data = await requestScore(true);
+      setAssessment(data);
+      setReport(data.report || '');
+    } catch (error) {
+      console.error('Error generating wallet report:', error);
+      alert('Failed to generate the detailed report. Please try again.');
+    } finally {
+      setIsLoadingReport(false);
+    }
+  };
+
   const resetAnalysis = () => {
     setWalletAddress('');
     setReport('');
+    setAssessment(null);
     setStep('input');
   };
 
@@ -155,11 +184,41 @@ const WalletRiskPage = () => {
               <div className="wallet-address">{walletAddress}</div>
             </div>
             
-            <div className="markdown-content">
-              <ReactMarkdown remarkPlugins={[remarkGfm]}>
-                {report}
-              </ReactMarkdown>
-            </div>
+            {assessment && (
+              <div className="risk-assessment">
+                <div className="risk-level">
+                  Risk level: <strong>{assessment.risk_level.toUpperCase()}</strong>
+                  {' '}(score {(assessment.risk_score * 100).toFixed(0)}/100)
+                </div>
+                {assessment.reasons.length > 0 ? (
+                  <ul className="risk-reasons">
+                    {assessment.reasons.map((reason) => (
+                      <li key={reason}>{reason}</li>
+                    ))}
+                  </ul>
+                ) : (
+                  <p className="risk-reasons">No risk flags raised</p>
+                )}
+              </div>
+            )}
+
+            {report ? (
+              <div className="markdown-content">
+                <ReactMarkdown remarkPlugins={[remarkGfm]}>
+                  {report}
+                </ReactMarkdown>
+              </div>
+            ) : (
+              <div className="button-container">
+                <button
+                  onClick={handleRequestReport}
+                  className="action-btn"
+                  disabled={isLoadingReport}
+                >
+                  {isLoadingReport ? 'Generating Report...' : 'Generate Detailed Report'}
+                </button>
+              </div>
+            )}
 
             <div className="button-container">
               <button 
@@ -0,0 +1,69 @@
+import asyncio
+import random
+import time
+import numpy as np
+from aiohttp import web
+from contract_agents.search_client import PerplexityClient
+
+# Stub server behaviour
+STUB_PORT = 8765
+STUB_LATENCY = 0.2        # Seconds per answer
+STUB_FAILURE_RATE = 0.2   # Share of requests answered with 429 or 503
+
+NUM_REQUESTS = 200
+CONCURRENCY = 50
+DISTINCT_QUERIES = 50     # Repeated queries exercise the TTL cache
+
+async def stub_handler(request):
+    """Perplexity-shaped answers with latency and injected 429/503s"""
+    payload = await request.json()
+    await asyncio.sleep(STUB_LATENCY)
+    if random.random() < STUB_FAILURE_RATE:
+        return web.json_response({"error": "try again"}, status=random.choice([429, 503]))
+    query = payload["messages"][0]["content"]
+    return web.json_response({
+        "citations": ["https://example.com"],
+        "choices": [{"message": {"content": f"Answer to {query}"}}]
+    })
+
+async def start_stub(port=STUB_PORT):
+    app = web.Application()
+    app.router.add_post("/chat/completions", stub_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+async def main():
+    runner = await start_stub()
+    client = PerplexityClient(api_key="stub", api_url=f"http://127.0.0.1:{STUB_PORT}/chat/completions")
+    queries = [f"query {i % DISTINCT_QUERIES}" for i in range(NUM_REQUESTS)]
+    random.shuffle(queries)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+    failures = 0
+
+    async def one(query):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.search(query)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    print(f"Searching {NUM_REQUESTS} queries ({DISTINCT_QUERIES} distinct) at concurrency {CONCURRENCY}...")
+    start = time.perf_counter()
+    await asyncio.gather(*[one(query) for query in queries])
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(f"{NUM_REQUESTS / elapsed:.2f} req/s | p50 {np.percentile(latencies, 50):.1f} ms | "
+          f"p99 {np.percentile(latencies, 99):.1f} ms | failures {failures} | cache {client.stats()}")
+    await client.close()
+    await runner.cleanup()
+
+# python -m contract_agents.benchmark_search (from server/)
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,9 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
 import asyncio
 import json
 
-async def code_updater_agent(code, changes):
-    client = AsyncGroq()  # Replace with your real key
-    
+def build_code_updater_agent_request(code, changes):
+    """Chat completion parameters for code_updater_agent"""
     user_prompt = f"""
 You are the **Elite Code Updater Agent**, an expert at precisely modifying code while maintaining perfect style and readability.
 
@@ -44,7 +43,7 @@ You are the **Elite Code Updater Agent**, an expert at precisely modifying code
 Now update the code with these changes while following all guidelines perfectly.
 """
 
-    response = await client.chat.completions.create(
+    return dict(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -55,5 +54,9 @@ Now update the code with these changes while following all guidelines perfectly.
         reasoning_format="hidden"
     )
 
-    data = response.choices[0].message.content
-    return data
\ No newline at end of file
+async def code_updater_agent(code, changes):
+    return await get_llm_gateway().complete(**build_code_updater_agent_request(code, changes))
+
+def code_updater_agent_stream(code, changes):
+    """Async iterator over the tokens of the updated code as they arrive"""
+    return get_llm_gateway().stream(**build_code_updater_agent_request(code, changes))
@@ -1,11 +1,13 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
+from utils.prompt_compaction import compact_contract
 import asyncio
 import json
 
-async def summariser_agent(search_responses, code: str, vulnerability_reasoning, vulnerabilities):
-    client = AsyncGroq()  # Replace with your real key
-    # Format the code with numbered lines
-    formatted_code = "\n".join([f"{i+1}. {line}" for i, line in enumerate(code.strip().splitlines())])
+def build_summariser_agent_request(search_responses, code: str, vulnerability_reasoning, vulnerabilities):
+    """Chat completion parameters for summariser_agent"""
+    # Number the lines (as the vulnerability line numbers do); long contracts keep the
+    # regions around flagged lines within the token budget, with their original numbers
+    formatted_code = compact_contract(code, vulnerabilities)
     # Construct the prompt based on your requirements
     user_prompt = f"""**Vulnerability Summary Prompt**  
 
@@ -22,7 +24,7 @@ You are a **Vulnerability Summarizer**, tasked with analyzing provided data to d
    ```  
 3. **Code Under Analysis**:  
    ```solidity  
-   {code}  
+   {formatted_code}  
    ```  
 4. **Detected Vulnerabilities** (JSON):  
    ```json  
@@ -70,8 +72,7 @@ Ask the user:
 - **Do not mention** internal workflows or downstream processes.  
 
 """
-    # print(formatted_code)
-    response = await client.chat.completions.create(
+    return dict(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -82,6 +83,9 @@ Ask the user:
         reasoning_format="hidden"
     )
 
-    data = response.choices[0].message.content
-    # print(data)
-    return data
\ No newline at end of file
+async def summariser_agent(search_responses, code: str, vulnerability_reasoning, vulnerabilities):
+    return await get_llm_gateway().complete(**build_summariser_agent_request(search_responses, code, vulnerability_reasoning, vulnerabilities))
+
+def summariser_agent_stream(search_responses, code: str, vulnerability_reasoning, vulnerabilities):
+    """Async iterator over the tokens of the vulnerability summary as they arrive"""
+    return get_llm_gateway().stream(**build_summariser_agent_request(search_responses, code, vulnerability_reasoning, vulnerabilities))
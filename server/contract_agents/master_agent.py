@@ -1,11 +1,17 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
 import asyncio
+import inspect
 import json
 
-async def master_agent(code: str, classification_result: str):
-    client = AsyncGroq()  # Replace with your real key
+async def master_agent(code: str, classification_result):
+    """
+    classification_result may be the label or an awaitable resolving to it, so the
+    prompt can be prepared while the classifier is still running.
+    """
     # Format the code with numbered lines
     formatted_code = "\n".join([f"{i+1}. {line}" for i, line in enumerate(code.strip().splitlines())])
+    if inspect.isawaitable(classification_result):
+        classification_result = await classification_result
     # Construct the prompt based on your requirements
     user_prompt = f"""
 You are provided with a code. It should understand the **context** below, and it should check the **code** for vulnerabilities (all of them). It can take the help of the **classification_result** to check exactly what the classifier has output, and see if the classifier is right or not.
@@ -66,7 +72,7 @@ Respond in **JSON** format:
 
 """
     # print(formatted_code)
-    response = await client.chat.completions.create(
+    data = await get_llm_gateway().complete(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -77,7 +83,5 @@ Respond in **JSON** format:
         response_format={"type": "json_object"},
         reasoning_format="hidden"
     )
-
-    data = response.choices[0].message.content
     # print(data)
     return json.loads(data)
\ No newline at end of file
@@ -0,0 +1,130 @@
+import aiohttp
+import asyncio
+import random
+import time
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+PERPLEXITY_API_URL = os.getenv("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions")
+PERPLEXITY_MAX_CONNECTIONS = int(os.getenv("PERPLEXITY_MAX_CONNECTIONS", "20"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "30"))          # Seconds per attempt
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))    # Seconds a search answer is reused
+SEARCH_CACHE_SIZE = 512
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5   # Seconds, doubled per attempt with full jitter
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SearchError(Exception):
+    """Raised when a search fails after every retry."""
+
+
+class PerplexityClient:
+    """
+    Async Perplexity client sharing one pooled keep-alive aiohttp session.
+    Each attempt has its own timeout, 429/5xx responses and connection errors
+    are retried with jittered exponential backoff, and answers are cached per
+    query for SEARCH_CACHE_TTL seconds.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_url: str = PERPLEXITY_API_URL,
+                 model: str = "sonar-pro", max_tokens: int = 300,
+                 max_connections: int = PERPLEXITY_MAX_CONNECTIONS, timeout: float = SEARCH_TIMEOUT,
+                 cache_ttl: float = SEARCH_CACHE_TTL, cache_size: int = SEARCH_CACHE_SIZE):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._session = None
+        self._loop = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _cached(self, query: str):
+        entry = self._cache.get(query)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._cache[query]
+            return None
+        self._cache.move_to_end(query)
+        return value
+
+    def _remember(self, query: str, value: Dict):
+        self._cache[query] = (time.monotonic() + self.cache_ttl, value)
+        self._cache.move_to_end(query)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def search(self, query: str) -> Dict:
+        """POST one chat completion and return the decoded JSON response (cached per query)."""
+        cached = self._cached(query)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        session = await self._get_session()
+        # Read the key per request: main.py only loads .env at startup, after imports
+        api_key = self.api_key or os.getenv("PERPLEXITY_API_KEY")
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": query}],
+            "max_tokens": self.max_tokens
+        }
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+        error = None
+        for attempt in range(MAX_RETRIES):
+            if attempt:
+                await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt))
+            try:
+                async with session.post(self.api_url, json=payload, headers=headers) as response:
+                    if response.status in RETRY_STATUSES:
+                        error = SearchError(f"HTTP {response.status}")
+                        continue
+                    if response.status >= 400:
+                        raise SearchError(f"HTTP {response.status}: {await response.text()}")
+                    data = await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = SearchError(f"{type(e).__name__}: {e}")
+                continue
+            self._remember(query, data)
+            return data
+        raise SearchError(f"Search failed after {MAX_RETRIES} attempts: {error}")
+
+    def stats(self):
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+_client = None
+
+
+def get_search_client() -> PerplexityClient:
+    """Process-wide client, so every search shares one connection pool and cache."""
+    global _client
+    if _client is None:
+        _client = PerplexityClient()
+    return _client
@@ -1,34 +1,19 @@
-import requests
-from dotenv import load_dotenv
-import os
+import asyncio
+from contract_agents.search_client import get_search_client, SearchError
 import json
 
-load_dotenv()
-PER = os.getenv("PERPLEXITY_API_KEY")
+MAX_SEARCHES = 3  # The master agent is asked for up to 3 searches
 
 async def search_web(query):
-    url = "https://api.perplexity.ai/chat/completions"
-
-    payload = {
-        "model": "sonar-pro",
-        "messages": [
-            {"role": "user", "content": query}
-        ],
-        "max_tokens": 300
-    }
-    headers = {
-        "Authorization": f"Bearer {PER}",
-        "Content-Type": "application/json"
-    }
-
-    response = requests.post(url, json=payload, headers=headers)
-
-    # ✅ Parse JSON response
+    # Pooled, retried and cached; see contract_agents/search_client.py
     try:
-        data = response.json()
-    except json.JSONDecodeError:
+        data = await get_search_client().search(query)
+    except json.JSONDecodeError as e:
         print("❌ Failed to decode JSON response.")
-        print("Raw response:", response.text)
+        print("Error:", e)
+        return
+    except SearchError as e:
+        print(f"❌ Search failed: {e}")
         return
 
     # ✅ Extract citations and response content
@@ -54,3 +39,22 @@ async def search_web(query):
         "📝 Response Content:\n\n"
         f"{response_content}"
     )
+
+async def search_many(queries, limit=MAX_SEARCHES):
+    """
+    Runs each query as its own concurrent search and joins the responses,
+    each under its query. Failed searches are left out.
+    """
+    if isinstance(queries, str):
+        queries = [queries]
+    queries = [query for query in queries if query][:limit]
+    responses = await asyncio.gather(*[search_web(query) for query in queries], return_exceptions=True)
+
+    sections = []
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            print(f"Search failed for {query!r}: {response}")
+            continue
+        if response:
+            sections.append(f"### Search: {query}\n\n{response}")
+    return "\n\n".join(sections)
@@ -1,4 +1,4 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
 import asyncio
 import json
 
@@ -25,7 +25,6 @@ def format_transaction_details(transaction_details) -> str:
     return "\n\n".join(output)
 
 async def wallet_finder(query, wallet_address, token_address, amt, transaction_details):
-    client = AsyncGroq()  # Replace with your real key
     # Format the code with numbered lines
     formatted_transactions = format_transaction_details(transaction_details)
     print(formatted_transactions)
@@ -108,7 +107,7 @@ In case of more than 3, use timestamps and amount to filter the best possible wa
 Go detect!
 """
     # print(formatted_code)
-    response = await client.chat.completions.create(
+    data = await get_llm_gateway().complete(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -119,7 +118,5 @@ Go detect!
         response_format={"type": "json_object"},
         reasoning_format="hidden"
     )
-
-    data = response.choices[0].message.content
     # print(data)
     return json.loads(data)
\ No newline at end of file
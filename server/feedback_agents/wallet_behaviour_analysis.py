@@ -1,4 +1,5 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
+from utils.prompt_compaction import compact_wallet_data
 import asyncio
 import json
 
@@ -24,11 +25,13 @@ def format_transaction_details(transaction_details) -> str:
 
     return "\n\n".join(output)
 
-async def fraud_analyzer(query, wallet_address, token_address, amt, transaction_details, total_transaction_details):
-    client = AsyncGroq()  # Replace with your real key
+def build_fraud_analyzer_request(query, wallet_address, token_address, amt, transaction_details, total_transaction_details):
+    """Chat completion parameters for fraud_analyzer"""
     # Format the code with numbered lines
     formatted_transactions = format_transaction_details(transaction_details)
     print(formatted_transactions)
+    # Counterparty summaries and relevance-ranked transfers instead of the raw dicts
+    total_transaction_details = compact_wallet_data(total_transaction_details, wallet_address, token_address)
     # Construct the prompt based on your requirements
     user_prompt = f"""
 You are acting as the **Deep Analysis Detective Agent**, assisting a user who suspects a fraudulent transaction involving their wallet.
@@ -66,8 +69,8 @@ transaction_details = {formatted_transactions}
    * These are transactions involving **wallets suspected by the first-stage agent**.
    * Use this to trace how the funds might have flowed after leaving the user.
 
-```python
-total_transaction_details = {total_transaction_details}
+```
+{total_transaction_details}
 ```
 
 ---
@@ -142,7 +145,7 @@ Think like a blockchain forensic analyst. Your response must be methodical, insi
 Be precise, comprehensive, and helpful. The user is relying on you for clarity and insight.
 """
     # print(formatted_code)
-    response = await client.chat.completions.create(
+    return dict(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -153,6 +156,9 @@ Be precise, comprehensive, and helpful. The user is relying on you for clarity a
         reasoning_format="hidden"
     )
 
-    data = response.choices[0].message.content
-    # print(data)
-    return data
\ No newline at end of file
+async def fraud_analyzer(query, wallet_address, token_address, amt, transaction_details, total_transaction_details):
+    return await get_llm_gateway().complete(**build_fraud_analyzer_request(query, wallet_address, token_address, amt, transaction_details, total_transaction_details))
+
+def fraud_analyzer_stream(query, wallet_address, token_address, amt, transaction_details, total_transaction_details):
+    """Async iterator over the tokens of the forensic report as they arrive"""
+    return get_llm_gateway().stream(**build_fraud_analyzer_request(query, wallet_address, token_address, amt, transaction_details, total_transaction_details))
@@ -1,22 +1,35 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from contract_agents.master_agent import master_agent
-from contract_agents.context_agent import summariser_agent
-from contract_agents.web_search import search_web
-from contract_agents.code_update import code_updater_agent
-from models.code_masking import load_model, predict
-from models.gnn_model import EnhancedFraudGNN
-from scraping.token_address_scrape import scrape_token
-from scraping.wallet_address_scrape import scrape_wallet
+from contract_agents.context_agent import summariser_agent, summariser_agent_stream
+from contract_agents.web_search import search_many
+from contract_agents.search_client import get_search_client
+from contract_agents.code_update import code_updater_agent, code_updater_agent_stream
+from models.code_masking import load_model, AsyncModelLoader, ClassifierEngine, predict_chunks, format_chunk_labels, shutdown_inference_executor, MODEL_PATH as CLASSIFIER_MODEL_PATH
+from models.gnn_wallet_score import GNNModelRegistry, load_global_graph, ingest_wallets, resolve_checkpoint, risk_category
+from models.gnn_batcher import GNNMicroBatcher
+from scraping.token_scanner import get_token_scanner, stop_token_scanner, TOKEN_SCAN_MAX_AGE
+from scraping.goplus_cache import cached_wallet_features, cached_token_features, goplus_cache_stats
+from scraping.goplus_executor import get_goplus_executor, shutdown_goplus_executor
 from scraping.scrape_transactions import get_wallet_transactions
-from wallet_token_agents.master_wallet_agent import wallet_analyst_agent
-from wallet_token_agents.master_token_agent import token_analyst_agent
+from scraping.basescan_client import get_basescan_client
+from wallet_token_agents.master_wallet_agent import wallet_analyst_agent, wallet_analyst_agent_stream
+from wallet_token_agents.master_token_agent import token_analyst_agent, token_analyst_agent_stream
 from feedback_agents.potential_wallet_finder import wallet_finder
-from feedback_agents.wallet_behaviour_analysis import fraud_analyzer
-from utils.utils import fetch_all_wallet_data
+from feedback_agents.wallet_behaviour_analysis import fraud_analyzer, fraud_analyzer_stream
+from utils.utils import fetch_all_wallet_data, iter_wallet_data
+from utils.result_cache import ResultCache, contract_hash
+from utils.llm_gateway import get_llm_gateway
+from utils.streaming import sse_event, sse_response, relay_tokens
+from utils.prompt_compaction import prompt_metrics
+from utils.risk_features import format_wallet_features, format_token_features, features_to_dict
+from wallet_token_agents.risk_scorer import assess_wallet, assess_token, format_assessment
 from dotenv import load_dotenv
+from typing import List
 import asyncio
+import hmac
+import os
 
 # -------------------------
 # FastAPI App Initialization
@@ -37,53 +50,163 @@ app.add_middleware(
 # -------------------------
 model = None
 tokenizer = None
+classifier_engine = None
+gnn_batcher = None
+analysis_cache = None
+
+# Bump when the /smart_contract agent prompts change, so cached summaries are not reused
+SMART_CONTRACT_PROMPT_VERSION = "3"
+SMART_CONTRACT_LLM = "deepseek-r1-distill-llama-70b"
 
 @app.on_event("startup")
 async def load_model_on_startup():
     print("Loading Keys...")
     load_dotenv()
     print("Keys loaded.")
-    global model, tokenizer
+    global model, tokenizer, classifier_engine
     print("Loading model on startup...")
     model, tokenizer = await load_model()
+    # Fixed 512-token padding: the classifier's pooling does not mask padding
+    classifier_engine = ClassifierEngine(model, tokenizer, dynamic_padding=False)
+    classifier_engine.start()
     print("Model loaded.")
+
+    global analysis_cache
+    checkpoint_mtime = os.path.getmtime(CLASSIFIER_MODEL_PATH) if os.path.exists(CLASSIFIER_MODEL_PATH) else 0
+    analysis_cache = ResultCache(
+        model_version=f"{CLASSIFIER_MODEL_PATH}@{checkpoint_mtime:.0f}:{AsyncModelLoader().backend}|{SMART_CONTRACT_LLM}",
+        prompt_version=SMART_CONTRACT_PROMPT_VERSION,
+        max_entries=int(os.getenv("ANALYSIS_CACHE_SIZE", "1024")),
+        db_path=os.getenv("ANALYSIS_CACHE_DB")  # Optional persistent tier
+    )
     print("Loading GNN model...")
-    gnn_model = EnhancedFraudGNN(in_channels=15, hidden_channels=512, out_channels=1, heads=4)
-    print(f"GNN model loaded with architecture: {gnn_model}")
+    global gnn_batcher
+    try:
+        gnn_model = await asyncio.to_thread(GNNModelRegistry().get)
+        global_graph = await asyncio.to_thread(load_global_graph)
+        if global_graph is None:
+            print("GNN graph snapshot not found, /gnn_score disabled.")
+        else:
+            gnn_batcher = GNNMicroBatcher(*global_graph, graph_loader=load_global_graph)
+            gnn_batcher.start()
+            print(f"GNN model loaded with architecture: {gnn_model}")
+    except Exception as e:
+        print(f"Error while loading GNN model: {e}")
+
+@app.on_event("shutdown")
+async def stop_background_clients():
+    if classifier_engine is not None:
+        await classifier_engine.stop()
+    shutdown_inference_executor()
+    if gnn_batcher is not None:
+        await gnn_batcher.stop()
+    await get_basescan_client().close()
+    await get_search_client().close()
+    await get_llm_gateway().close()
+    await stop_token_scanner()
+    shutdown_goplus_executor()
 
 # -------------------------
 # Request Model
 # -------------------------
 class ContractRequest(BaseModel):
     contract: str
+    chunked: bool = False  # Classify overlapping windows of long contracts instead of the first 512 tokens
+
+class GNNScoreRequest(BaseModel):
+    addresses: List[str]
+
+class TokenBatchRequest(BaseModel):
+    token_addresses: List[str]
+    chain_id: str = "8453"
+    background: bool = False          # Return a job id to poll instead of waiting for the scan
+    max_age: float = TOKEN_SCAN_MAX_AGE  # Seconds a stored result is reused before rescanning
+    include_raw: bool = False         # Also return the raw GoPlus responses of the calls made
 
 # -------------------------
 # Endpoint
 # -------------------------
-@app.post("/smart_contract")
-async def analyze_smart_contract(req: ContractRequest):
+def contract_cache_key(req: ContractRequest):
+    # Identical contracts (modulo comments and whitespace) reuse the stored summary
+    return f"{contract_hash(req.contract)}:{'chunked' if req.chunked else 'head'}"
+
+async def prepare_contract_summary(req: ContractRequest):
+    """
+    Runs every /smart_contract stage before the summariser and returns its arguments.
+
+    Stages run as a small DAG: classifier -> master agent -> concurrent searches -> summariser.
+    The classifier starts first and the master agent formats its prompt while it runs.
+    """
     contract = req.contract
-    print("Predicting Vulnerability...")
-    vulnerability = await predict(model, tokenizer, contract)
-    print("Vulnerability Detected:", vulnerability)
+
+    async def classify():
+        print("Predicting Vulnerability...")
+        if req.chunked:
+            result = format_chunk_labels(await predict_chunks(model, tokenizer, contract))
+        else:
+            result = await classifier_engine.predict(contract)
+        print("Vulnerability Detected:", result)
+        return result
+
+    classification = asyncio.create_task(classify())
 
     print("Running Master Agent...")
-    data = await master_agent(contract, vulnerability)  # Empty context for now
+    data = await master_agent(contract, classification)
 
     searches = data.get("searches", [])
     vulnerability_reasoning = data.get("vulnerability_reasoning", "")
     vulnerabilities = data.get("vulnerabilities", [])
 
     print("Generating Searches...")
-    search_response = await search_web(searches)
+    search_response = await search_many(searches)
+
+    return search_response, contract, vulnerability_reasoning, vulnerabilities
+
+@app.post("/smart_contract")
+async def analyze_smart_contract(req: ContractRequest):
+    cache_key = contract_cache_key(req)
+    cached = await analysis_cache.aget(cache_key)
+    if cached is not None:
+        print("Returning cached analysis.")
+        return {"summary": cached}
+
+    summary_inputs = await prepare_contract_summary(req)
 
     print("Generating Summary...")
-    summary = await summariser_agent(search_response, contract, vulnerability_reasoning, vulnerabilities)
+    summary = await summariser_agent(*summary_inputs)
+    await analysis_cache.aset(cache_key, summary)
 
     return {
         "summary": summary
     }
 
+@app.post("/smart_contract/stream")
+async def analyze_smart_contract_stream(req: ContractRequest):
+    """
+    Server-sent events variant of /smart_contract: "stage" events while the
+    analysis runs, then the summary as "token" events and a final "done".
+    """
+    cache_key = contract_cache_key(req)
+
+    async def events():
+        cached = await analysis_cache.aget(cache_key)
+        if cached is not None:
+            yield sse_event("token", {"text": cached})
+            yield sse_event("done", {"cached": True})
+            return
+
+        yield sse_event("stage", {"stage": "analysing"})
+        summary_inputs = await prepare_contract_summary(req)
+
+        yield sse_event("stage", {"stage": "summarising"})
+        collected = []
+        async for event in relay_tokens(summariser_agent_stream(*summary_inputs), collected):
+            yield event
+        await analysis_cache.aset(cache_key, "".join(collected))
+        yield sse_event("done", {"cached": False})
+
+    return sse_response(events())
+
 @app.post("/update_code")
 async def update(request: Request):
     """
@@ -105,11 +228,28 @@ async def update(request: Request):
 
     return {"updated_code": updated_code}
 
+@app.post("/update_code/stream")
+async def update_stream(request: Request):
+    """
+    Server-sent events variant of /update_code. Tokens are passed through
+    unmodified, so any surrounding ``` fence is left for the client to strip.
+    """
+    data = await request.json()
+    code = data.get("code", "")
+    changes = data.get("changes", "")
+
+    async def events():
+        async for event in relay_tokens(code_updater_agent_stream(code, changes)):
+            yield event
+        yield sse_event("done", {})
+
+    return sse_response(events())
+
 @app.post("/wallet_score")
 async def score_wallet(request: Request):
     """
-    Endpoint to score a wallet based on the provided request.
-    This is a placeholder for the actual implementation.
+    Scores a wallet with the rule-based GoPlus scorer. The LLM report is only
+    generated when requested ("report": true) or when the rules are ambiguous.
     """
     data = await request.json()
     wallet_address = data.get("wallet_address", "")
@@ -117,16 +257,48 @@ async def score_wallet(request: Request):
     if not wallet_address:
         return {"error": "Wallet address is required"}
     
-    wallet_data = await scrape_wallet(wallet_address)
+    try:
+        features = await cached_wallet_features(wallet_address)
+    except Exception as e:
+        return {"error": f"Error analyzing address {wallet_address}: {e}"}
+
+    assessment = assess_wallet(features)
+    report = None
+    if data.get("report") or assessment.ambiguous:
+        report = await wallet_analyst_agent(f"{format_wallet_features(features)}\n{format_assessment(assessment)}")
+    return {**assessment.to_dict(), "report": report, "features": features_to_dict(features)}
 
-    report = await wallet_analyst_agent(wallet_data)
-    return {"report": report}
+@app.post("/wallet_score/stream")
+async def score_wallet_stream(request: Request):
+    """Server-sent events variant of /wallet_score; the report is streamed only when requested or ambiguous"""
+    data = await request.json()
+    wallet_address = data.get("wallet_address", "")
+
+    if not wallet_address:
+        return {"error": "Wallet address is required"}
+
+    async def events():
+        yield sse_event("stage", {"stage": "fetching_wallet"})
+        features = await cached_wallet_features(wallet_address)
+        assessment = assess_wallet(features)
+        yield sse_event("features", features_to_dict(features))
+        yield sse_event("assessment", assessment.to_dict())
+        if not (data.get("report") or assessment.ambiguous):
+            yield sse_event("done", {"report": False})
+            return
+        yield sse_event("stage", {"stage": "analysis_streaming"})
+        prompt_data = f"{format_wallet_features(features)}\n{format_assessment(assessment)}"
+        async for event in relay_tokens(wallet_analyst_agent_stream(prompt_data)):
+            yield event
+        yield sse_event("done", {})
+
+    return sse_response(events())
     
 @app.post("/token_score")
 async def score_token(request: Request):
     """
-    Endpoint to score a token based on the provided request.
-    This is a placeholder for the actual implementation.
+    Scores a token with the rule-based GoPlus scorer. The LLM report is only
+    generated when requested ("report": true) or when the rules are ambiguous.
     """
     data = await request.json()
     token_address = data.get("token_address", "")
@@ -134,10 +306,74 @@ async def score_token(request: Request):
     if not token_address:
         return {"error": "Token address is required"}
     
-    token_data = await scrape_token(chain_id="8453", addresses=[token_address])
+    try:
+        features = await cached_token_features("8453", token_address)
+    except Exception as e:
+        return {"error": f"Error analyzing token {token_address}: {e}"}
+
+    assessment = assess_token(features)
+    report = None
+    if data.get("report") or assessment.ambiguous:
+        report = await token_analyst_agent(f"{format_token_features(features)}\n{format_assessment(assessment)}")
+    return {**assessment.to_dict(), "report": report, "features": features_to_dict(features)}
 
-    report = await token_analyst_agent(token_data)
-    return {"report": report}
+@app.post("/token_score/stream")
+async def score_token_stream(request: Request):
+    """Server-sent events variant of /token_score; the report is streamed only when requested or ambiguous"""
+    data = await request.json()
+    token_address = data.get("token_address", "")
+
+    if not token_address:
+        return {"error": "Token address is required"}
+
+    async def events():
+        yield sse_event("stage", {"stage": "fetching_token"})
+        features = await cached_token_features("8453", token_address)
+        assessment = assess_token(features)
+        yield sse_event("features", features_to_dict(features))
+        yield sse_event("assessment", assessment.to_dict())
+        if not (data.get("report") or assessment.ambiguous):
+            yield sse_event("done", {"report": False})
+            return
+        yield sse_event("stage", {"stage": "analysis_streaming"})
+        prompt_data = f"{format_token_features(features)}\n{format_assessment(assessment)}"
+        async for event in relay_tokens(token_analyst_agent_stream(prompt_data)):
+            yield event
+        yield sse_event("done", {})
+
+    return sse_response(events())
+
+@app.post("/token_score/batch")
+async def score_token_batch(req: TokenBatchRequest):
+    """
+    GoPlus security fields for many tokens at once, fetched in maximal GoPlus
+    batches and stored locally. With background=true the scan runs as a job
+    polled at /token_score/batch/{job_id}.
+    """
+    if not req.token_addresses:
+        return {"error": "At least one token address is required"}
+
+    scanner = get_token_scanner()
+    if req.background:
+        return {"job_id": scanner.submit(req.chain_id, req.token_addresses, req.max_age, req.include_raw)}
+    if req.include_raw:
+        raw = []
+        results = await scanner.scan(req.chain_id, req.token_addresses, req.max_age, raw_archive=raw)
+        return {"results": results, "raw": raw}
+    return {"results": await scanner.scan(req.chain_id, req.token_addresses, req.max_age)}
+
+@app.get("/token_score/batch/stats")
+async def token_batch_stats():
+    """Stored tokens, GoPlus calls (and failures) and running jobs of the batch scanner"""
+    # stats() counts rows in the SQLite store, so it runs off the event loop
+    return await asyncio.to_thread(get_token_scanner().stats)
+
+@app.get("/token_score/batch/{job_id}")
+async def token_batch_job(job_id: str):
+    job = get_token_scanner().jobs.get(job_id)
+    if job is None:
+        return {"error": "Unknown job id"}
+    return job
 
 @app.post("/feedback")
 async def feedback(request: Request):
@@ -166,6 +402,138 @@ async def feedback(request: Request):
 
     return {"report": final_results}
 
+@app.post("/feedback/stream")
+async def feedback_stream(request: Request):
+    """
+    Server-sent events variant of /feedback. Emits a "stage" event as each step
+    completes (transactions_fetched, suspects_found, one wallet_fetched per
+    suspect wallet, analysis_streaming), then the forensic report as "token" events.
+    """
+    data = await request.json()
+    fdata = data.get("fdata", "")
+    wallet_address = data.get("wallet_address", "")
+    token_address = data.get("token_address", "")
+    amt = data.get("amt", "")
+
+    if not fdata or not wallet_address:
+        return {"error": "Feedback data, wallet address, token address, and amount are required"}
+
+    async def events():
+        transaction_details = await get_wallet_transactions(wallet_address, token_address)
+        count = len(transaction_details) if isinstance(transaction_details, list) else 0
+        yield sse_event("stage", {"stage": "transactions_fetched", "transactions": count})
+
+        report = await wallet_finder(fdata, wallet_address, token_address, amt, transaction_details)
+        search_queries = report["search_queries"]
+        yield sse_event("stage", {"stage": "suspects_found", "wallets": [query[0] for query in search_queries if query]})
+
+        results_dict = {}
+        async for suspect, suspect_data in iter_wallet_data(search_queries):
+            results_dict[suspect] = suspect_data
+            yield sse_event("stage", {"stage": "wallet_fetched", "wallet": suspect, "error": isinstance(suspect_data, dict)})
+
+        yield sse_event("stage", {"stage": "analysis_streaming"})
+        tokens = fraud_analyzer_stream(fdata, wallet_address, token_address, amt, transaction_details, results_dict)
+        async for event in relay_tokens(tokens):
+            yield event
+        yield sse_event("done", {})
+
+    return sse_response(events())
+
+@app.post("/gnn_score")
+async def gnn_score(req: GNNScoreRequest):
+    """
+    Scores a list of wallet addresses with the fraud GNN. Concurrent calls are
+    micro-batched into a single forward pass over their merged neighbourhoods.
+    """
+    if gnn_batcher is None:
+        return {"error": "GNN model or graph snapshot not loaded"}
+    if not req.addresses:
+        return {"error": "At least one address is required"}
+
+    scores = await gnn_batcher.score(req.addresses)
+
+    results = []
+    for address, score in scores.items():
+        if score is None:
+            results.append({"address": address, "risk_score": None, "risk_category": None, "message": "Address not in graph"})
+        else:
+            results.append({"address": address, "risk_score": float(score), "risk_category": risk_category(score)})
+    return {"scores": results}
+
+@app.get("/prompt_metrics")
+async def prompt_metrics_stats():
+    """Token counts before and after prompt compaction, per prompt section"""
+    return prompt_metrics.stats()
+
+@app.get("/goplus_cache/stats")
+async def goplus_cache_statistics():
+    return goplus_cache_stats()
+
+@app.get("/goplus_executor/stats")
+async def goplus_executor_stats():
+    """Queue depth, wait and call times of the GoPlus SDK thread pool"""
+    return get_goplus_executor().stats()
+
+@app.get("/llm_gateway/stats")
+async def llm_gateway_stats():
+    """Chat completions sent and coalesced by the shared LLM gateway"""
+    return get_llm_gateway().stats()
+
+@app.get("/gnn_model/stats")
+async def gnn_model_stats():
+    return GNNModelRegistry().stats()
+
+def require_admin(request: Request):
+    """Reject the request unless it carries ADMIN_TOKEN (admin endpoints are off when it is unset)"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    supplied = request.headers.get("x-admin-token", "")
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        supplied = authorization[7:]
+    if not hmac.compare_digest(supplied.encode(), admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/gnn_model/reload")
+async def gnn_model_reload(request: Request):
+    """
+    Admin only. Hot-swaps the resident GNN without restarting the server: re-reads
+    the configured checkpoint, or switches to {"checkpoint": "<name>.pth"} from
+    GNN_CHECKPOINT_DIR.
+    """
+    require_admin(request)
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+
+    try:
+        model_path = resolve_checkpoint(data.get("checkpoint") if isinstance(data, dict) else None)
+    except ValueError as e:
+        return {"error": str(e)}
+    try:
+        await asyncio.to_thread(GNNModelRegistry().reload, model_path)
+    except Exception as e:
+        return {"error": f"Failed to load checkpoint: {e}"}
+    return GNNModelRegistry().stats()
+
+@app.post("/gnn_graph/ingest")
+async def gnn_graph_ingest(req: GNNScoreRequest, request: Request):
+    """
+    Admin only. Fetches the wallets' Basescan transactions, appends the ones not
+    yet in the GNN graph and saves the updated snapshot; /gnn_score uses it from
+    its next batch.
+    """
+    require_admin(request)
+    if not req.addresses:
+        return {"error": "At least one address is required"}
+    counts = await ingest_wallets(req.addresses)
+    if counts is None:
+        return {"error": "GNN graph snapshot not found"}
+    return {"edges_added": counts, "total_edges_added": sum(counts.values())}
+
 # uvicorn main:app --reload --host 0.0.0.0 --port 8000
 if __name__ == "__main__":
     import uvicorn
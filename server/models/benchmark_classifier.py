@@ -0,0 +1,92 @@
+import asyncio
+import random
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from models.code_masking import load_model, predict, ClassifierEngine, INFERENCE_WORKERS, TORCH_THREADS_PER_WORKER
+
+# Benchmark configuration
+NUM_REQUESTS = 64
+CONCURRENCY_LEVELS = (1, 8, 64)
+
+CONTRACT_TEMPLATE = """
+contract Vault{i} {{
+    mapping(address => uint256) public balances;
+    function deposit() public payable {{ balances[msg.sender] += msg.value; }}
+    function withdraw(uint256 amount) public {{
+        require(balances[msg.sender] >= amount);
+        (bool ok, ) = msg.sender.call{{value: amount}}("");
+        balances[msg.sender] -= amount;
+    }}
+}}
+"""
+
+def make_contracts(n, seed=0):
+    """Synthetic contracts of varied length (1 to 12 copies of a vault template)"""
+    rng = random.Random(seed)
+    return ["".join(CONTRACT_TEMPLATE.format(i=i * 100 + j) for j in range(rng.randint(1, 12))) for i in range(n)]
+
+async def run_load(call, contracts, concurrency):
+    """Run every contract through `call` with at most `concurrency` in flight; returns (seconds, latencies)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(code):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(code)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(code) for code in contracts])
+    return time.perf_counter() - start, latencies
+
+def report(name, elapsed, latencies):
+    latencies = np.array(latencies) * 1000
+    print(f"{name:28}: {len(latencies) / elapsed:8.2f} req/s | "
+          f"p50 {np.percentile(latencies, 50):8.1f} ms | p99 {np.percentile(latencies, 99):8.1f} ms")
+
+async def benchmark(model, tokenizer, num_requests=NUM_REQUESTS, concurrency_levels=CONCURRENCY_LEVELS):
+    contracts = make_contracts(num_requests)
+    print(f"Inference executor: {INFERENCE_WORKERS} workers x {TORCH_THREADS_PER_WORKER} torch threads")
+    # Same pool asyncio.to_thread uses by default, for comparison
+    default_pool = ThreadPoolExecutor()
+
+    # Warm-up so lazy initialisation is not measured
+    await predict(model, tokenizer, contracts[0])
+    await predict(model, tokenizer, contracts[0], executor=default_pool)
+
+    for concurrency in concurrency_levels:
+        print(f"Benchmarking {num_requests} requests at concurrency {concurrency}...")
+        elapsed, latencies = await run_load(
+            lambda code: predict(model, tokenizer, code, executor=default_pool), contracts, concurrency
+        )
+        report("predict (default pool)", elapsed, latencies)
+
+        elapsed, latencies = await run_load(lambda code: predict(model, tokenizer, code), contracts, concurrency)
+        report("predict (inference executor)", elapsed, latencies)
+
+        for dynamic_padding in (False, True):
+            engine = ClassifierEngine(model, tokenizer, dynamic_padding=dynamic_padding)
+            await engine.predict(contracts[0])
+            elapsed, latencies = await run_load(engine.predict, contracts, concurrency)
+            report(f"engine (dynamic={dynamic_padding})", elapsed, latencies)
+            await engine.stop()
+    default_pool.shutdown()
+
+def padding_parity(model, tokenizer, contracts):
+    """Share of contracts whose label is unchanged by dynamic padding (must be 1.0 before enabling it)"""
+    fixed = ClassifierEngine(model, tokenizer, dynamic_padding=False).classify_batch(contracts)
+    dynamic = ClassifierEngine(model, tokenizer, dynamic_padding=True).classify_batch(contracts)
+    agree = sum(a == b for a, b in zip(fixed, dynamic))
+    print(f"Dynamic padding label parity: {agree}/{len(contracts)} ({agree / len(contracts):.1%})")
+    return agree / len(contracts)
+
+async def main():
+    model, tokenizer = await load_model()
+    padding_parity(model, tokenizer, make_contracts(NUM_REQUESTS))
+    await benchmark(model, tokenizer)
+
+# python -m models.benchmark_classifier (from server/)
+if __name__ == "__main__":
+    asyncio.run(main())
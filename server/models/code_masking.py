@@ -1,14 +1,38 @@
 import asyncio
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import torch
 import torch.nn as nn
 from torch.utils.data import Dataset
-from transformers import RobertaTokenizer, RobertaModel
+from transformers import RobertaTokenizerFast, RobertaModel
 import torch.nn.functional as F
 
+try:
+    import onnxruntime as ort
+except ImportError:  # Optional: only needed for the ONNX backends
+    ort = None
+
 # Configuration
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 MODEL_PATH = "models/trained_model.pt"
+ONNX_MODEL_PATH = "models/trained_model.onnx"
+ONNX_INT8_MODEL_PATH = "models/trained_model.int8.onnx"
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")  # Selected with CLASSIFIER_BACKEND
 MAX_LENGTH = 512
+MAX_BATCH_SIZE = 16      # Contracts per forward pass in the inference engine
+MAX_BATCH_WAIT = 0.01    # Seconds the engine waits for a batch to fill
+LENGTH_BUCKET = 64       # Token-length granularity for grouping contracts of similar size
+CHUNK_STRIDE = 128       # Tokens shared by consecutive sliding windows
+FOCUS_LINES = 3          # Most-attended lines reported per chunk
+INFERENCE_WORKERS = int(os.getenv("CLASSIFIER_WORKERS", "2"))  # Threads running forward passes
+# Intra-op torch threads per worker; workers x threads should not exceed the cores
+TORCH_THREADS_PER_WORKER = int(os.getenv("CLASSIFIER_TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // INFERENCE_WORKERS)
+
+# Lines that open a new function-level segment
+SEGMENT_START = re.compile(r"^\s*(function|modifier|constructor|fallback|receive)\b")
 
 # Predefined label mapping
 LABEL_MAP = {
@@ -39,6 +63,166 @@ class CodeClassifier(nn.Module):
         logits = self.classifier(pooled_output)
         return logits, attn_weights
 
+def quantize_model(model):
+    """Dynamic int8 quantization of every nn.Linear (CPU only)"""
+    return torch.ao.quantization.quantize_dynamic(model.cpu(), {nn.Linear}, dtype=torch.qint8)
+
+def checkpoint_fingerprint(path=MODEL_PATH):
+    """mtime and size of the fp32 checkpoint, stamped next to the ONNX graphs exported from it"""
+    stat = os.stat(path)
+    return f"{stat.st_mtime:.0f}:{stat.st_size}"
+
+def onnx_is_current(path, fingerprint):
+    """True if the ONNX graph at `path` was exported from the checkpoint with this fingerprint"""
+    try:
+        with open(f"{path}.source") as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+def export_onnx(model, path=ONNX_MODEL_PATH, quantized_path=None, opset=17, source=None):
+    """
+    Export CodeClassifier to ONNX with dynamic batch and sequence axes. With
+    quantized_path, also write an ONNX Runtime dynamic-int8 copy of the graph.
+    With source (a checkpoint_fingerprint), stamp each graph so a retrained
+    checkpoint triggers a fresh export.
+    """
+    model = model.cpu().eval()
+    dummy_ids = torch.ones((1, 16), dtype=torch.long)
+    dummy_mask = torch.ones((1, 16), dtype=torch.long)
+    axes = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        model,
+        (dummy_ids, dummy_mask),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits", "attn_weights"],
+        dynamic_axes={"input_ids": axes, "attention_mask": axes, "logits": {0: "batch"}, "attn_weights": axes},
+        opset_version=opset,
+        dynamo=False
+    )
+    if quantized_path:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+    if source is not None:
+        for exported in filter(None, (path, quantized_path)):
+            with open(f"{exported}.source", "w") as f:
+                f.write(source)
+    return path
+
+class OnnxClassifier:
+    """ONNX Runtime session exposing CodeClassifier's call signature and outputs"""
+    def __init__(self, path, num_threads=None):
+        if ort is None:
+            raise ImportError("onnxruntime is required for the ONNX classifier backends")
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+    
+    def __call__(self, input_ids, attention_mask):
+        logits, attn_weights = self.session.run(
+            ["logits", "attn_weights"],
+            {
+                "input_ids": input_ids.cpu().numpy().astype(np.int64),
+                "attention_mask": attention_mask.cpu().numpy().astype(np.int64)
+            }
+        )
+        return torch.from_numpy(logits), torch.from_numpy(attn_weights)
+    
+    def eval(self):
+        return self
+
+def build_backend(model, backend):
+    """Turn a loaded fp32 CodeClassifier into the requested inference backend"""
+    if backend == "torch":
+        return model
+    if backend == "int8":
+        return quantize_model(model)
+    if backend in ("onnx", "onnx-int8"):
+        quantized = backend == "onnx-int8"
+        path = ONNX_INT8_MODEL_PATH if quantized else ONNX_MODEL_PATH
+        source = checkpoint_fingerprint()
+        if not os.path.exists(path) or not onnx_is_current(path, source):
+            print(f"Exporting classifier to {path}...")
+            export_onnx(model, ONNX_MODEL_PATH, quantized_path=ONNX_INT8_MODEL_PATH if quantized else None,
+                        source=source)
+        return OnnxClassifier(path, num_threads=TORCH_THREADS_PER_WORKER)
+    raise ValueError(f"Unknown classifier backend: {backend} (expected one of {BACKENDS})")
+
+def model_device(model):
+    """Device a backend takes its inputs on: the model's own, CPU for int8 and ONNX Runtime"""
+    if isinstance(model, nn.Module):
+        for parameter in model.parameters():
+            return parameter.device
+    return torch.device("cpu")
+
+def load_fp32_model():
+    """Blocking load of the fp32 CodeClassifier checkpoint"""
+    model = CodeClassifier(num_labels=len(LABEL_MAP)).to(DEVICE)
+    model.load_state_dict(torch.load(MODEL_PATH, map_location=DEVICE))
+    model.eval()
+    return model
+
+def parity_check(reference, candidate, tokenizer, codes, batch_size=MAX_BATCH_SIZE):
+    """
+    Compare the labels of two classifier backends on a held-out set of contracts.
+    
+    Returns:
+        dict: {"total", "agree", "agreement", "mismatches": [(index, reference_label, candidate_label), ...]}
+    """
+    reference_engine = ClassifierEngine(reference, tokenizer, dynamic_padding=False)
+    candidate_engine = ClassifierEngine(candidate, tokenizer, dynamic_padding=False)
+    mismatches = []
+    for start in range(0, len(codes), batch_size):
+        batch = codes[start:start + batch_size]
+        reference_labels = reference_engine.classify_batch(batch)
+        candidate_labels = candidate_engine.classify_batch(batch)
+        for offset, (expected, actual) in enumerate(zip(reference_labels, candidate_labels)):
+            if expected != actual:
+                mismatches.append((start + offset, expected, actual))
+    total = len(codes)
+    return {
+        "total": total,
+        "agree": total - len(mismatches),
+        "agreement": (total - len(mismatches)) / total if total else 1.0,
+        "mismatches": mismatches
+    }
+
+def pin_torch_threads(num_threads):
+    torch.set_num_threads(num_threads)
+
+_inference_executor = None
+
+def get_inference_executor():
+    """
+    Dedicated pool for forward passes. asyncio.to_thread shares the default
+    executor (min(32, cores + 4) threads), and each of those threads would use
+    every core for torch's intra-op parallelism; this pool runs
+    INFERENCE_WORKERS threads pinned to TORCH_THREADS_PER_WORKER threads each.
+    """
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = ThreadPoolExecutor(
+            max_workers=INFERENCE_WORKERS,
+            thread_name_prefix="classifier",
+            initializer=pin_torch_threads,
+            initargs=(TORCH_THREADS_PER_WORKER,)
+        )
+    return _inference_executor
+
+async def run_inference(func, *args, executor=None):
+    """Run a blocking inference call on the inference executor (or the given one)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or get_inference_executor(), functools.partial(func, *args))
+
+def shutdown_inference_executor():
+    global _inference_executor
+    if _inference_executor is not None:
+        _inference_executor.shutdown(wait=False)
+        _inference_executor = None
+
 class AsyncModelLoader:
     _instance = None
     
@@ -48,35 +232,29 @@ class AsyncModelLoader:
             cls._instance._initialized = False
         return cls._instance
     
-    async def initialize(self):
+    async def initialize(self, backend=None):
         if not self._initialized:
+            backend = backend or os.getenv("CLASSIFIER_BACKEND", "torch")
             self.tokenizer = await asyncio.to_thread(
-                RobertaTokenizer.from_pretrained, 
+                RobertaTokenizerFast.from_pretrained, 
                 "huggingface/CodeBERTa-small-v1"
             )
-            model = CodeClassifier(num_labels=len(LABEL_MAP)).to(DEVICE)
-            model.load_state_dict(
-                await asyncio.to_thread(
-                    torch.load, 
-                    MODEL_PATH, 
-                    map_location=DEVICE
-                )
-            )
-            model.eval()
-            self.model = model
+            model = await asyncio.to_thread(load_fp32_model)
+            self.model = await asyncio.to_thread(build_backend, model, backend)
+            self.backend = backend
             self._initialized = True
     
     @property
     def is_initialized(self):
         return self._initialized
 
-async def load_model():
-    """Async load model and tokenizer (singleton pattern)"""
+async def load_model(backend=None):
+    """Async load model and tokenizer (singleton pattern); backend defaults to $CLASSIFIER_BACKEND"""
     loader = AsyncModelLoader()
-    await loader.initialize()
+    await loader.initialize(backend)
     return loader.model, loader.tokenizer
 
-async def predict(model, tokenizer, code: str) -> str:
+async def predict(model, tokenizer, code: str, executor=None) -> str:
     """
     Async predict the vulnerability label for a single Solidity code snippet
     
@@ -84,11 +262,12 @@ async def predict(model, tokenizer, code: str) -> str:
         model: Loaded model from load_model()
         tokenizer: Loaded tokenizer from load_model()
         code: Solidity code string to classify
+        executor: Pool for the forward pass (defaults to the inference executor)
         
     Returns:
         str: The predicted vulnerability label name
     """
-    # Tokenize in a thread
+    # Tokenize in a thread (the Rust tokenizer releases the GIL)
     encoding = await asyncio.to_thread(
         tokenizer,
         code,
@@ -98,15 +277,269 @@ async def predict(model, tokenizer, code: str) -> str:
         return_tensors="pt"
     )
     
-    input_ids = encoding["input_ids"].squeeze().unsqueeze(0).to(DEVICE)
-    attention_mask = encoding["attention_mask"].squeeze().unsqueeze(0).to(DEVICE)
+    device = model_device(model)
+    input_ids = encoding["input_ids"].squeeze().unsqueeze(0).to(device)
+    attention_mask = encoding["attention_mask"].squeeze().unsqueeze(0).to(device)
     
-    # Run model inference in a thread
-    logits, _ = await asyncio.to_thread(
-        model,
-        input_ids=input_ids,
-        attention_mask=attention_mask
-    )
+    # Run model inference on the inference executor (inference mode is thread-local, so enter it there)
+    logits = await run_inference(forward_logits, model, input_ids, attention_mask, executor=executor)
     
     pred_idx = torch.argmax(logits, dim=1).item()
-    return IDX_TO_LABEL[pred_idx]
\ No newline at end of file
+    return IDX_TO_LABEL[pred_idx]
+
+def forward_logits(model, input_ids, attention_mask):
+    """Run the classifier without building autograd graphs"""
+    return forward_with_attention(model, input_ids, attention_mask)[0]
+
+def forward_with_attention(model, input_ids, attention_mask):
+    """Run the classifier in inference mode, returning (logits, attention weights)"""
+    with torch.inference_mode():
+        return model(input_ids=input_ids, attention_mask=attention_mask)
+
+def split_functions(code: str):
+    """Split a contract into function-level segments: [(char_start, text), ...]"""
+    segments = []
+    start = 0
+    position = 0
+    for line in code.splitlines(keepends=True):
+        if SEGMENT_START.match(line) and position > start:
+            segments.append((start, code[start:position]))
+            start = position
+        position += len(line)
+    if position > start:
+        segments.append((start, code[start:position]))
+    return segments
+
+def tokenize_chunks(tokenizer, code: str, mode: str = "window", stride: int = CHUNK_STRIDE):
+    """
+    Tokenize a contract into MAX_LENGTH-token chunks with character offsets.
+    
+    mode="window" uses overlapping sliding windows sharing `stride` tokens;
+    mode="function" classifies each function-level segment (segments longer
+    than MAX_LENGTH are truncated). Offsets need a fast (Rust) tokenizer.
+    """
+    if not getattr(tokenizer, "is_fast", False):
+        raise ValueError("Chunked classification needs a fast tokenizer for offset mapping")
+    
+    if mode == "window":
+        encoding = tokenizer(
+            code,
+            truncation=True,
+            max_length=MAX_LENGTH,
+            stride=stride,
+            return_overflowing_tokens=True,
+            return_offsets_mapping=True
+        )
+        return [
+            (encoding["input_ids"][i], encoding["attention_mask"][i], encoding["offset_mapping"][i])
+            for i in range(len(encoding["input_ids"]))
+        ]
+    
+    if mode == "function":
+        segments = split_functions(code)
+        encoding = tokenizer(
+            [text for _, text in segments],
+            truncation=True,
+            max_length=MAX_LENGTH,
+            return_offsets_mapping=True
+        )
+        chunks = []
+        for i, (char_start, _) in enumerate(segments):
+            # Shift offsets from segment-relative to contract-relative (special tokens stay (0, 0))
+            offsets = [(a + char_start, b + char_start) if b > a else (a, b) for a, b in encoding["offset_mapping"][i]]
+            chunks.append((encoding["input_ids"][i], encoding["attention_mask"][i], offsets))
+        return chunks
+    
+    raise ValueError(f"Unknown chunk mode: {mode}")
+
+def classify_chunks(model, tokenizer, code: str, mode: str = "window", stride: int = CHUNK_STRIDE,
+                    focus_lines: int = FOCUS_LINES, batch_size: int = MAX_BATCH_SIZE):
+    """
+    Classify every chunk of a contract, at most `batch_size` chunks per forward
+    pass so very long contracts do not exhaust memory. Chunks are padded to
+    MAX_LENGTH like the engine, since the attention pooling does not mask padding.
+    
+    Returns:
+        dict: {
+            "label": most confident non-"normal" chunk label, else "normal",
+            "chunks": [{"label", "confidence", "start_line", "end_line", "focus_lines"}, ...]
+        }
+    """
+    chunks = tokenize_chunks(tokenizer, code, mode=mode, stride=stride)
+    if not chunks:
+        return {"label": "normal", "chunks": []}
+    device = model_device(model)
+    probs = []
+    attn_weights = []
+    for start in range(0, len(chunks), batch_size):
+        padded = tokenizer.pad(
+            [{"input_ids": ids, "attention_mask": mask} for ids, mask, _ in chunks[start:start + batch_size]],
+            padding="max_length",
+            max_length=MAX_LENGTH,
+            return_tensors="pt"
+        )
+        logits, weights = forward_with_attention(
+            model,
+            padded["input_ids"].to(device),
+            padded["attention_mask"].to(device)
+        )
+        probs.append(torch.softmax(logits.float(), dim=1).cpu().numpy())
+        attn_weights.append(weights.squeeze(-1).float().cpu().numpy())
+    probs = np.concatenate(probs)
+    attn_weights = np.concatenate(attn_weights)
+    
+    # 1-based line number of any character offset
+    line_starts = np.array([0] + [m.end() for m in re.finditer("\n", code)])
+    def line_of(char):
+        return int(np.searchsorted(line_starts, char, side="right"))
+    
+    results = []
+    for i, (_, _, offsets) in enumerate(chunks):
+        offsets = np.asarray(offsets).reshape(-1, 2)
+        real = offsets[:, 1] > offsets[:, 0]  # Skip special tokens
+        if not real.any():
+            continue
+        starts = offsets[real, 0]
+        ends = offsets[real, 1]
+        
+        # Attention mass per line, from the weights CodeClassifier pools with
+        token_lines = np.searchsorted(line_starts, starts, side="right")
+        line_weights = {}
+        for line, weight in zip(token_lines.tolist(), attn_weights[i, :len(offsets)][real].tolist()):
+            line_weights[line] = line_weights.get(line, 0.0) + weight
+        
+        pred_idx = int(probs[i].argmax())
+        results.append({
+            "label": IDX_TO_LABEL[pred_idx],
+            "confidence": float(probs[i, pred_idx]),
+            "start_line": line_of(int(starts.min())),
+            "end_line": line_of(max(int(ends.max()) - 1, 0)),
+            "focus_lines": sorted(line_weights, key=line_weights.get, reverse=True)[:focus_lines]
+        })
+    
+    flagged = [chunk for chunk in results if chunk["label"] != "normal"]
+    label = max(flagged, key=lambda chunk: chunk["confidence"])["label"] if flagged else "normal"
+    return {"label": label, "chunks": results}
+
+async def predict_chunks(model, tokenizer, code: str, mode: str = "window", stride: int = CHUNK_STRIDE) -> dict:
+    """Async classify_chunks: full-coverage classification of long contracts"""
+    return await run_inference(classify_chunks, model, tokenizer, code, mode, stride)
+
+def format_chunk_labels(result: dict) -> str:
+    """Render classify_chunks output as the classification hint passed to the agents"""
+    lines = [f"Overall: {result['label']}"]
+    for chunk in result["chunks"]:
+        lines.append(
+            f"Lines {chunk['start_line']}-{chunk['end_line']}: {chunk['label']} "
+            f"(confidence {chunk['confidence']:.2f}, focus lines {chunk['focus_lines']})"
+        )
+    return "\n".join(lines)
+
+class ClassifierEngine:
+    """
+    Micro-batching inference engine for CodeClassifier.
+    
+    Concurrent predict() calls are queued and collected for up to MAX_BATCH_WAIT
+    seconds (or MAX_BATCH_SIZE contracts). The batch is tokenized once, padded
+    to MAX_LENGTH and run in inference mode on the inference executor; results
+    come back through futures.
+    
+    CodeClassifier's attention pooling does not mask padding, so its logits
+    depend on the padded length and only the padded-to-512 inputs it was trained
+    on give the reference outputs. dynamic_padding=True instead groups contracts
+    into LENGTH_BUCKET-sized buckets padded to their longest member; it is faster
+    but can change labels, so only use it after checking label parity on the
+    deployed checkpoint (models/benchmark_classifier.py reports it).
+    """
+    def __init__(self, model, tokenizer, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_BATCH_WAIT,
+                 dynamic_padding=False, bucket_size=LENGTH_BUCKET, executor=None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.dynamic_padding = dynamic_padding
+        self.bucket_size = bucket_size
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self._worker = None
+    
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+    
+    async def predict(self, code: str) -> str:
+        """Queue one contract and wait for its predicted vulnerability label"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((code, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            codes = [code for code, _ in batch]
+            try:
+                labels = await run_inference(self.classify_batch, codes, executor=self.executor)
+            except Exception as e:
+                print(f"Error while classifying batch of {len(codes)} contracts: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), label in zip(batch, labels):
+                if not future.done():
+                    future.set_result(label)
+    
+    def length_buckets(self, encodings):
+        """Group sequence positions by padded length bucket"""
+        buckets = {}
+        for i, input_ids in enumerate(encodings["input_ids"]):
+            if self.dynamic_padding:
+                key = -(-len(input_ids) // self.bucket_size)
+            else:
+                key = 0
+            buckets.setdefault(key, []).append(i)
+        return buckets.values()
+    
+    def classify_batch(self, codes):
+        """Blocking: classify a list of contracts, returning one label per contract"""
+        encodings = self.tokenizer(codes, truncation=True, max_length=MAX_LENGTH)
+        labels = [None] * len(codes)
+        device = model_device(self.model)
+        
+        for positions in self.length_buckets(encodings):
+            features = [{key: encodings[key][i] for key in ("input_ids", "attention_mask")} for i in positions]
+            padded = self.tokenizer.pad(
+                features,
+                padding="longest" if self.dynamic_padding else "max_length",
+                max_length=None if self.dynamic_padding else MAX_LENGTH,
+                return_tensors="pt"
+            )
+            logits = forward_logits(
+                self.model,
+                padded["input_ids"].to(device),
+                padded["attention_mask"].to(device)
+            )
+            for i, pred_idx in zip(positions, torch.argmax(logits, dim=1).tolist()):
+                labels[i] = IDX_TO_LABEL[pred_idx]
+        return labels
@@ -0,0 +1,69 @@
+import os
+import time
+import torch
+import pandas as pd
+from transformers import RobertaTokenizerFast
+from models.code_masking import (
+    load_fp32_model, quantize_model, export_onnx, checkpoint_fingerprint, OnnxClassifier, ClassifierEngine, parity_check,
+    ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH
+)
+from models.benchmark_classifier import make_contracts
+
+# Held-out contracts for the parity check (CSV with a "code" column)
+HOLDOUT_PATH = "Data/classifier_holdout.csv"
+LATENCY_SAMPLES = 20
+
+def load_holdout():
+    if os.path.exists(HOLDOUT_PATH):
+        return pd.read_csv(HOLDOUT_PATH)["code"].astype(str).tolist()
+    print(f"Warning: {HOLDOUT_PATH} not found, checking parity on synthetic contracts")
+    return make_contracts(64)
+
+def tensor_bytes(value):
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(tensor_bytes(v) for v in value)
+    return 0
+
+def model_size_mb(model):
+    """Weight memory of a torch model (quantized packed params included), or the ONNX file size"""
+    if isinstance(model, OnnxClassifier):
+        return os.path.getsize(model.path) / 1e6
+    return sum(tensor_bytes(v) for v in model.state_dict().values()) / 1e6
+
+def latency_ms(model, tokenizer, codes):
+    """Mean single-contract latency, padded to MAX_LENGTH like predict()"""
+    engine = ClassifierEngine(model, tokenizer, dynamic_padding=False)
+    engine.classify_batch(codes[:1])  # Warm-up
+    start = time.perf_counter()
+    for code in codes:
+        engine.classify_batch([code])
+    return (time.perf_counter() - start) / len(codes) * 1000
+
+def main():
+    torch.set_num_threads(os.cpu_count() or 1)
+    tokenizer = RobertaTokenizerFast.from_pretrained("huggingface/CodeBERTa-small-v1")
+    reference = load_fp32_model().cpu()
+    holdout = load_holdout()
+
+    print("Quantizing Linear layers to int8...")
+    backends = {"int8": quantize_model(reference)}
+
+    print(f"Exporting ONNX models to {ONNX_MODEL_PATH} and {ONNX_INT8_MODEL_PATH}...")
+    export_onnx(reference, ONNX_MODEL_PATH, quantized_path=ONNX_INT8_MODEL_PATH, source=checkpoint_fingerprint())
+    backends["onnx"] = OnnxClassifier(ONNX_MODEL_PATH)
+    backends["onnx-int8"] = OnnxClassifier(ONNX_INT8_MODEL_PATH)
+
+    samples = holdout[:LATENCY_SAMPLES]
+    print(f"{'torch':10}: {model_size_mb(reference):8.1f} MB | {latency_ms(reference, tokenizer, samples):8.1f} ms")
+    for name, model in backends.items():
+        parity = parity_check(reference, model, tokenizer, holdout)
+        print(f"{name:10}: {model_size_mb(model):8.1f} MB | {latency_ms(model, tokenizer, samples):8.1f} ms | "
+              f"label agreement {parity['agree']}/{parity['total']} ({parity['agreement']:.2%})")
+        for index, expected, actual in parity["mismatches"][:10]:
+            print(f"    #{index}: fp32={expected} {name}={actual}")
+
+# python -m models.export_classifier (from server/)
+if __name__ == "__main__":
+    main()
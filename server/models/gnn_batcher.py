@@ -0,0 +1,133 @@
+import asyncio
+import numpy as np
+from models.gnn_wallet_score import GNNModelRegistry, predict_nodes, NUM_HOPS
+
+class GNNMicroBatcher:
+    """
+    Collects concurrent scoring requests for a short window and answers them with
+    one forward pass over the union of their k-hop neighbourhoods.
+
+    Each request is a list of addresses, split into chunks of at most
+    max_batch_size so no forward pass covers more targets than that; a batch
+    takes whole chunks until the next one would overflow it. Within a batch all
+    requested node ids are merged, scored together via predict_nodes and fanned back out to the
+    per-request futures. The union contains every edge each target's score
+    depends on, so a node's score matches what scoring it alone would give.
+    The model is taken from GNNModelRegistry per batch, so a hot-swapped
+    checkpoint is picked up by the next batch. With a graph_loader (such as
+    load_global_graph) the graph is refreshed per batch too, and addresses are
+    resolved against the graph that batch is scored on.
+    """
+    def __init__(self, data, node_map, index, max_batch_size=1024, max_wait=0.01, num_hops=NUM_HOPS,
+                 graph_loader=None):
+        self.graph = (data, node_map, index)
+        self.graph_loader = graph_loader
+        self.max_batch_size = max_batch_size  # Max target nodes per forward pass
+        self.max_wait = max_wait              # Seconds to wait for a batch to fill
+        self.num_hops = num_hops
+        self.queue = asyncio.Queue()
+        self._carry = None  # Chunk that did not fit in the previous batch
+        self._worker = None
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    @staticmethod
+    def lookup(node_map, address):
+        node = node_map.get(address)
+        if node is None and isinstance(address, str):
+            node = node_map.get(address.lower())
+        return node
+
+    async def score(self, addresses):
+        """
+        Returns:
+            dict: {address: score} with None for addresses not in the graph
+        """
+        addresses = list(dict.fromkeys(addresses))
+        if not addresses:
+            return {}
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for start in range(0, len(addresses), self.max_batch_size):
+            future = loop.create_future()
+            await self.queue.put((addresses[start:start + self.max_batch_size], future))
+            futures.append(future)
+
+        results = {}
+        for chunk in await asyncio.gather(*futures):
+            results.update(chunk)
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._carry is not None:
+                batch, self._carry = [self._carry], None
+            else:
+                batch = [await self.queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while count < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if count + len(item[0]) > self.max_batch_size:
+                    self._carry = item
+                    break
+                batch.append(item)
+                count += len(item[0])
+            await self._process(batch)
+
+    def _predict(self, batch):
+        """Resolve every request of the batch on the current graph and score the union in one pass"""
+        if self.graph_loader is not None:
+            self.graph = self.graph_loader() or self.graph
+        data, node_map, index = self.graph
+
+        requests = []
+        for addresses, _ in batch:
+            nodes = {address: self.lookup(node_map, address) for address in addresses}
+            requests.append({address: node for address, node in nodes.items() if node is not None})
+        known = [node for nodes in requests for node in nodes.values()]
+        if not known:
+            return requests, None, None
+
+        node_ids = np.unique(np.asarray(known, dtype=np.int64))
+        model = GNNModelRegistry().get()
+        return requests, node_ids, predict_nodes(model, data, index, node_ids, self.num_hops).numpy()
+
+    async def _process(self, batch):
+        try:
+            requests, node_ids, scores = await asyncio.to_thread(self._predict, batch)
+        except Exception as e:
+            print(f"Error while scoring GNN batch of {sum(len(addresses) for addresses, _ in batch)} addresses: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (addresses, future), nodes in zip(batch, requests):
+            if future.done():
+                continue
+            results = {address: None for address in addresses}
+            if nodes:
+                ids = np.fromiter(nodes.values(), dtype=np.int64, count=len(nodes))
+                results.update(zip(nodes.keys(), scores[np.searchsorted(node_ids, ids)].tolist()))
+            future.set_result(results)
@@ -1,4 +1,4 @@
-import requests
+import asyncio
 import pandas as pd
 import torch
 import torch.nn.functional as F
@@ -6,7 +6,15 @@ from torch_geometric.nn import SAGEConv, GATConv
 from torch_geometric.utils import add_self_loops
 from tqdm import tqdm
 import numpy as np
+import os
+import time
+import threading
+from dataclasses import dataclass
 from models.graph_utils import load_graph_data
+from models.graph_snapshot import load_graph_snapshot, read_snapshot_meta, snapshot_token
+from models.graph_store import IncrementalGraphStore
+from models.subgraph import load_or_build_index
+from scraping.basescan_client import BasescanClient, get_basescan_client, TRANSACTION_ACTIONS
 from datetime import datetime
 
 # Corrected Model definition with proper dimensions
@@ -30,17 +38,26 @@ class EnhancedFraudGNN(torch.nn.Module):
         return torch.sigmoid(x).squeeze()
 
 # Configuration
-API_KEY = os.getenv("BASESCAN_API_KEY")
-BASESCAN_API_URL = "https://api.basescan.org/api"
 MODEL_PATH = "fraud_gnn_final.pth"
+GRAPH_SNAPSHOT_PATH = os.getenv("GNN_GRAPH_SNAPSHOT", "graph_snapshots/train")  # Written by test.py
+NUM_HOPS = 4  # One per message-passing layer in EnhancedFraudGNN
 
-def load_model():
+# Persisted global graph: (data, node_map, csr_index), reopened when the snapshot changes
+_global_graph = None
+_global_graph_token = None
+
+# Live graph store for /gnn_graph/ingest, reopened when the snapshot is rebuilt elsewhere
+_graph_store = None
+_graph_store_token = None
+_graph_store_lock = None
+
+def load_checkpoint(model_path=MODEL_PATH):
     """Load the trained GNN model with correct architecture"""
     # Using the dimensions we discovered from the error messages
     model = EnhancedFraudGNN(in_channels=15, hidden_channels=512, out_channels=1, heads=4)
     
-    # Load the state dict
-    state_dict = torch.load(MODEL_PATH)
+    # Load the state dict (tensors only, never arbitrary pickled objects)
+    state_dict = torch.load(model_path, map_location='cpu', weights_only=True)
     
     # Handle potential CUDA/CPU device mismatch
     if not torch.cuda.is_available():
@@ -50,52 +67,197 @@ def load_model():
     model.eval()
     return model
 
-def fetch_all_transactions(address):
-    """Fetch all transaction types for an address"""
-    tx_types = [
-        "txlist",        # Normal transactions
-        "tokentx",       # Token transfers
-        "nfttx",         # NFT transfers
-        "txlistinternal" # Internal transactions
-    ]
+def resolve_checkpoint(name=None):
+    """
+    Path of an allow-listed checkpoint: MODEL_PATH when no name is given, otherwise
+    a .pth file directly inside GNN_CHECKPOINT_DIR (unset disables switching).
+    """
+    if not name:
+        return MODEL_PATH
+    checkpoint_dir = os.getenv("GNN_CHECKPOINT_DIR")
+    if not checkpoint_dir:
+        raise ValueError("Checkpoint switching is disabled (GNN_CHECKPOINT_DIR is not set)")
+    if os.path.basename(name) != name or not name.endswith(".pth"):
+        raise ValueError(f"Invalid checkpoint name: {name}")
+    checkpoint_dir = os.path.realpath(checkpoint_dir)
+    path = os.path.realpath(os.path.join(checkpoint_dir, name))
+    if os.path.dirname(path) != checkpoint_dir or not os.path.isfile(path):
+        raise ValueError(f"Unknown checkpoint: {name}")
+    return path
+
+@dataclass(frozen=True)
+class LoadedGNN:
+    """One loaded checkpoint and its load metadata, replaced as a whole on reload"""
+    model: torch.nn.Module
+    model_path: str
+    load_time: float
+    loaded_at: str
+    load_count: int
+
+class GNNModelRegistry:
+    """Process-wide holder for the fraud GNN: loaded once, swappable in place"""
+    _instance = None
     
-    all_transactions = []
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._state = None
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+    
+    def _load(self, model_path):
+        start = time.perf_counter()
+        model = load_checkpoint(model_path)
+        load_time = time.perf_counter() - start
+        
+        # Swap in one assignment so concurrent readers see either the old or the new state
+        previous = self._state
+        self._state = LoadedGNN(
+            model=model,
+            model_path=model_path,
+            load_time=load_time,
+            loaded_at=datetime.now().isoformat(),
+            load_count=previous.load_count + 1 if previous else 1
+        )
+    
+    def get(self):
+        if self._state is None:
+            with self._lock:
+                if self._state is None:
+                    self._load(MODEL_PATH)
+        return self._state.model
+    
+    def reload(self, model_path=None):
+        """Hot-swap to a checkpoint from resolve_checkpoint (or re-read the current one) without a restart"""
+        with self._lock:
+            self._load(model_path or (self._state.model_path if self._state else MODEL_PATH))
+        return self._state.model
+    
+    def stats(self):
+        state = self._state
+        if state is None:
+            return {'loaded': False, 'model_path': MODEL_PATH}
+        tensors = list(state.model.parameters()) + list(state.model.buffers())
+        return {
+            'loaded': True,
+            'model_path': state.model_path,
+            'loaded_at': state.loaded_at,
+            'load_count': state.load_count,
+            'load_time_ms': round(state.load_time * 1000, 3),
+            'parameters': sum(t.numel() for t in state.model.parameters()),
+            'memory_bytes': sum(t.numel() * t.element_size() for t in tensors),
+        }
+    
+    @property
+    def is_initialized(self):
+        return self._state is not None
+
+def load_model():
+    """Return the resident GNN model, loading the checkpoint on first use"""
+    return GNNModelRegistry().get()
+
+def load_global_graph(path=GRAPH_SNAPSHOT_PATH):
+    """
+    Open the persisted global graph snapshot and its CSR index, or None if there
+    is none. The opened graph is reused until the snapshot's metadata changes
+    (rebuilt from new rows by load_or_build_graph, or re-saved by the graph store).
+    """
+    global _global_graph, _global_graph_token
+    meta = read_snapshot_meta(path)
+    if meta is None:
+        return None
+    token = snapshot_token(meta)
+    if _global_graph is None or token != _global_graph_token:
+        data, node_map = load_graph_snapshot(path)
+        _global_graph = (data, node_map, load_or_build_index(path, data))
+        _global_graph_token = token
+    return _global_graph
+
+def predict_nodes(model, data, index, node_ids, num_hops=NUM_HOPS):
+    """Score nodes by running the model on their k-hop in-neighbourhood only"""
+    sub_data, mapping = index.subgraph_data(data, node_ids, num_hops)
+    with torch.no_grad():
+        predictions = model(sub_data.x, sub_data.edge_index, sub_data.edge_attr).view(-1)
+    return predictions[mapping]
+
+def risk_category(score):
+    if score >= 0.8:
+        return "HIGH"
+    elif score >= 0.5:
+        return "MEDIUM"
+    return "LOW"
+
+async def fetch_all_transactions_async(address, client=None):
+    """Fetch all transaction types for an address, actions and pages concurrently"""
+    client = client or get_basescan_client()
+    fetched = await client.fetch_actions(address, TRANSACTION_ACTIONS, sort="asc")
     
-    for tx_type in tx_types:
-        print(f"Fetching {tx_type} transactions...")
-        page = 1
-        while True:
-            params = {
-                "module": "account",
-                "action": tx_type,
-                "address": address,
-                "startblock": 0,
-                "endblock": 99999999,
-                "page": page,
-                "offset": 10000,
-                "sort": "asc",
-                "apikey": API_KEY
-            }
-            
-            response = requests.get(BASESCAN_API_URL, params=params)
-            data = response.json()
-            
-            if data["status"] != "1":
-                break
-                
-            transactions = data["result"]
-            if not transactions:
-                break
-                
-            # Add transaction type to each record
-            for tx in transactions:
-                tx['tx_type'] = tx_type
-                
-            all_transactions.extend(transactions)
-            page += 1
-            
+    all_transactions = []
+    for tx_type, transactions in fetched.items():
+        print(f"Fetched {len(transactions)} {tx_type} transactions")
+        # Add transaction type to each record
+        for tx in transactions:
+            tx['tx_type'] = tx_type
+        all_transactions.extend(transactions)
     return all_transactions
 
+def fetch_all_transactions(address):
+    """Fetch all transaction types for an address (blocking wrapper for CLI use)"""
+    async def run():
+        client = BasescanClient()
+        try:
+            return await fetch_all_transactions_async(address, client)
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+def open_graph_store(path=GRAPH_SNAPSHOT_PATH):
+    """Return the live graph store over the snapshot at path, or None if there is no snapshot"""
+    global _graph_store, _graph_store_token
+    meta = read_snapshot_meta(path)
+    if meta is None:
+        return None
+    token = snapshot_token(meta)
+    if _graph_store is None or token != _graph_store_token:
+        _graph_store = IncrementalGraphStore.from_snapshot(path)
+        _graph_store_token = token
+    return _graph_store
+
+async def ingest_wallets(addresses, path=GRAPH_SNAPSHOT_PATH, client=None):
+    """
+    Fetch each wallet's Basescan history, append the transactions the graph store
+    has not ingested yet and save the store back over the snapshot, which
+    load_global_graph (and so the GNN batcher) picks up on its next call.
+    Appending costs time proportional to the new transactions; the save rewrites
+    the snapshot, so ingest wallets in batches rather than one call each.
+
+    Returns:
+        dict: {address: edges appended}, or None if there is no snapshot
+    """
+    global _graph_store_lock, _graph_store_token
+    if _graph_store_lock is None:
+        _graph_store_lock = asyncio.Lock()
+
+    addresses = list(dict.fromkeys(address.lower() for address in addresses))
+    fetched = await asyncio.gather(*[fetch_all_transactions_async(address, client) for address in addresses])
+
+    async with _graph_store_lock:
+        store = await asyncio.to_thread(open_graph_store, path)
+        if store is None:
+            return None
+
+        def apply():
+            counts = {address: store.ingest_address(address, transactions)
+                      for address, transactions in zip(addresses, fetched)}
+            if any(counts.values()):
+                store.save(path)
+            return counts
+
+        counts = await asyncio.to_thread(apply)
+        if any(counts.values()):
+            _graph_store_token = snapshot_token(read_snapshot_meta(path))
+        return counts
+
 def preprocess_transactions(transactions, address):
     """Convert raw transactions into features for the model"""
     # Convert to DataFrame
@@ -114,7 +276,7 @@ def preprocess_transactions(transactions, address):
         'FIRST_TX_TIMESTAMP': min(int(tx['timeStamp']) for tx in transactions),
         'LAST_TX_TIMESTAMP': max(int(tx['timeStamp']) for tx in transactions),
         'TOKEN_TX': sum(1 for tx in transactions if tx['tx_type'] == 'tokentx'),
-        'NFT_TX': sum(1 for tx in transactions if tx['tx_type'] == 'nfttx'),
+        'NFT_TX': sum(1 for tx in transactions if tx['tx_type'] == 'tokennfttx'),
         'INTERNAL_TX': sum(1 for tx in transactions if tx['tx_type'] == 'txlistinternal')
     }
     
@@ -142,29 +304,30 @@ def generate_fraud_score(address):
     print("Loading model and generating prediction...")
     model = load_model()
     
-    # Create graph data (you'll need to adjust this based on your graph_utils implementation)
-    test_data, test_node_map = load_graph_data(test_df, 'data.db')
-    
-    with torch.no_grad():
-        predictions = model(test_data.x, test_data.edge_index, test_data.edge_attr)
-        if address in test_node_map:
-            node_idx = test_node_map[address]
-            score = predictions[node_idx].item() if isinstance(predictions[node_idx], torch.Tensor) else float(predictions[node_idx])
-        else:
-            score = 0.0
+    # Score on the address's k-hop neighbourhood in the global graph when it is there
+    global_graph = load_global_graph()
+    if global_graph is not None and address in global_graph[1]:
+        data, node_map, index = global_graph
+        score = predict_nodes(model, data, index, [node_map[address]])[0].item()
+    else:
+        # Create graph data (you'll need to adjust this based on your graph_utils implementation)
+        test_data, test_node_map = load_graph_data(test_df, 'data.db')
+
+        with torch.no_grad():
+            predictions = model(test_data.x, test_data.edge_index, test_data.edge_attr)
+            if address in test_node_map:
+                node_idx = test_node_map[address]
+                score = predictions[node_idx].item() if isinstance(predictions[node_idx], torch.Tensor) else float(predictions[node_idx])
+            else:
+                score = 0.0
     
     # Step 4: Interpret score
-    if score >= 0.8:
-        risk_category = "HIGH"
-    elif score >= 0.5:
-        risk_category = "MEDIUM"
-    else:
-        risk_category = "LOW"
+    risk_category_label = risk_category(score)
     
     return {
         'address': address,
         'risk_score': float(score),
-        'risk_category': risk_category,
+        'risk_category': risk_category_label,
         'transaction_count': len(transactions),
         'last_updated': datetime.now().isoformat()
     }
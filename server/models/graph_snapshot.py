@@ -0,0 +1,184 @@
+# graph_snapshot.py
+import os
+import json
+import shutil
+import hashlib
+import torch
+import numpy as np
+from datetime import datetime
+from torch_geometric.data import Data
+from models.graph_utils import load_graph_data
+
+# Bump when the on-disk layout, the graph features or the source fingerprint change
+SNAPSHOT_VERSION = 2
+SNAPSHOT_ARRAYS = ['x', 'edge_index', 'edge_attr', 'addresses', 'address_nodes']
+META_FILE = 'meta.json'
+
+class SnapshotNodeMap:
+    """
+    Read-only address -> node index map backed by the snapshot's sorted address
+    array. Behaves like the node_map dict returned by load_graph_data, but
+    lookups are a binary search over a memory-mapped array instead of a dict
+    held in RAM.
+    """
+    def __init__(self, addresses, address_nodes):
+        self.addresses = addresses          # Sorted, bytes dtype
+        self.address_nodes = address_nodes  # Node index for each sorted address
+
+    def _position(self, address):
+        if not isinstance(address, str):
+            return None
+        key = address.encode('utf-8')
+        position = int(np.searchsorted(self.addresses, key))
+        if position < len(self.addresses) and self.addresses[position] == key:
+            return position
+        return None
+
+    def __contains__(self, address):
+        return self._position(address) is not None
+
+    def __getitem__(self, address):
+        position = self._position(address)
+        if position is None:
+            raise KeyError(address)
+        return int(self.address_nodes[position])
+
+    def get(self, address, default=None):
+        position = self._position(address)
+        return default if position is None else int(self.address_nodes[position])
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __iter__(self):
+        for address in self.addresses:
+            yield address.decode('utf-8')
+
+    def items(self):
+        for address, node in zip(self.addresses, self.address_nodes):
+            yield address.decode('utf-8'), int(node)
+
+# Function to fingerprint the SQLite database a graph is built from
+def compute_source_fingerprint(db_name, addresses=None):
+    """
+    Hashes the size and mtime of the database file (and its WAL, if any), plus
+    the seed addresses and SNAPSHOT_VERSION. Any committed insert, update or
+    delete touches the files, so this never reads the tables; the cost is the
+    occasional needless rebuild when the file changes without graph rows changing.
+    """
+    digest = hashlib.sha256(f"snapshot-v{SNAPSHOT_VERSION}".encode())
+    for name in (db_name, f"{db_name}-wal"):
+        try:
+            stat = os.stat(name)
+            digest.update(f"{os.path.basename(name)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(f"{os.path.basename(name)}:missing;".encode())
+
+    if addresses is not None:
+        for address in sorted(str(a) for a in set(addresses)):
+            digest.update(address.encode('utf-8'))
+            digest.update(b"\n")
+    return digest.hexdigest()
+
+# Function to write a graph and its node map to a snapshot directory
+def save_graph_snapshot(data, node_map, path, source_hash=None, extra_meta=None):
+    """
+    Writes x, edge_index, edge_attr and the node_map address table as .npy files
+    that load_graph_snapshot can memory-map. The directory is written next to
+    its final location, the old one is renamed aside, the new one renamed in and
+    only then is the old one deleted, so readers never see a half-written
+    snapshot and a failed swap leaves the old one recoverable at `path.old`.
+    Already-open memory maps of the old snapshot stay valid after deletion.
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    np.save(os.path.join(tmp_path, 'x.npy'), data.x.cpu().numpy().astype(np.float32, copy=False))
+    np.save(os.path.join(tmp_path, 'edge_index.npy'), data.edge_index.cpu().numpy().astype(np.int64, copy=False))
+    np.save(os.path.join(tmp_path, 'edge_attr.npy'), data.edge_attr.cpu().numpy().astype(np.float32, copy=False))
+
+    # Sorted address index for binary-search lookups
+    addresses = np.array([address.encode('utf-8') for address in node_map.keys()], dtype=np.bytes_)
+    nodes = np.fromiter(node_map.values(), dtype=np.int64, count=len(addresses))
+    order = np.argsort(addresses, kind='stable')
+    np.save(os.path.join(tmp_path, 'addresses.npy'), addresses[order])
+    np.save(os.path.join(tmp_path, 'address_nodes.npy'), nodes[order])
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'source_hash': source_hash,
+        'num_nodes': int(data.x.size(0)),
+        'num_edges': int(data.edge_index.size(1)),
+        'created': datetime.now().isoformat(),
+        **(extra_meta or {}),
+    }
+    with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=4)
+
+    old_path = f"{path}.old"
+    if os.path.exists(old_path):
+        shutil.rmtree(old_path)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    print(f"Graph snapshot saved to {path} (Nodes: {meta['num_nodes']}, Edges: {meta['num_edges']})")
+
+# Function to read a snapshot's metadata, or None if there is no usable snapshot
+def read_snapshot_meta(path):
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error while reading snapshot metadata {meta_path}: {e}")
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION:
+        return None
+    return meta
+
+# Function to identify one written snapshot (changes whenever it is rebuilt or re-saved)
+def snapshot_token(meta):
+    return (meta.get('source_hash'), meta.get('created'), meta.get('num_nodes'), meta.get('num_edges'))
+
+# Function to open a snapshot without reading it into memory
+def load_graph_snapshot(path, mmap=True):
+    """
+    Returns (Data, SnapshotNodeMap). With mmap=True the arrays are mapped
+    copy-on-write, so opening is near-instant and pages are only read when a
+    tensor is actually touched.
+    """
+    mmap_mode = 'c' if mmap else None
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in SNAPSHOT_ARRAYS}
+
+    data = Data(
+        x=torch.from_numpy(arrays['x']),
+        edge_index=torch.from_numpy(arrays['edge_index']),
+        edge_attr=torch.from_numpy(arrays['edge_attr'])
+    )
+    return data, SnapshotNodeMap(arrays['addresses'], arrays['address_nodes'])
+
+# Function to check whether a snapshot no longer matches the SQLite tables
+def is_snapshot_stale(path, db_name, addresses=None):
+    meta = read_snapshot_meta(path)
+    if meta is None:
+        return True
+    return meta.get('source_hash') != compute_source_fingerprint(db_name, addresses)
+
+# Function to reuse a fresh snapshot, or build the graph and snapshot it
+def load_or_build_graph(df, db_name, path):
+    addresses = set(df['ADDRESS'])
+    source_hash = compute_source_fingerprint(db_name, addresses)
+    meta = read_snapshot_meta(path)
+    if meta is not None and meta.get('source_hash') == source_hash:
+        print(f"Loading graph snapshot from {path}...")
+        return load_graph_snapshot(path)
+
+    data, node_map = load_graph_data(df, db_name)
+    if data is not None:
+        save_graph_snapshot(data, node_map, path, source_hash=source_hash)
+    return data, node_map
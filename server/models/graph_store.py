@@ -0,0 +1,265 @@
+# graph_store.py
+import torch
+import numpy as np
+import pandas as pd
+from torch_geometric.data import Data
+from models.graph_utils import GRAPH_TABLES, convert_timestamps, timestamp_gap_features
+from models.graph_snapshot import load_graph_snapshot, read_snapshot_meta, save_graph_snapshot
+
+# Basescan actions / scrape_transactions tx_type values and the graph table they correspond to
+TX_TYPE_CATEGORIES = {
+    'txlist': 'transactions',
+    'normal': 'transactions',
+    'txlistinternal': 'transactions',
+    'tokentx': 'token_transfers',
+    'erc20': 'token_transfers',
+    'tokennfttx': 'nft_transfers',
+    'nfttx': 'nft_transfers',
+    'nft': 'nft_transfers',
+}
+
+class IncrementalGraphStore:
+    """
+    Live graph wrapped around the (Data, node_map) pair from load_graph_data.
+
+    Node features and edges sit in over-allocated NumPy buffers that double when
+    full, so appending a batch of edges costs time proportional to the batch, not
+    to the graph. Degrees are bumped in place and new addresses get fresh rows.
+
+    Timestamp gaps are tracked per GRAPH_TABLES category as running statistics
+    (count, first, last, min gap, max gap), updated per batch without keeping
+    the timestamps. The shipped checkpoint was trained on all-zero gap columns
+    (see timestamp_gap_features), so the node columns only follow these stats
+    with live_gap_features=True; the gaps are graph-wide, so that write touches
+    every node row.
+
+    ingested_blocks is the last Basescan block ingested per wallet, so
+    ingest_address only appends transactions it has not seen before. It, the gap
+    stats and the source hash of the snapshot the store was opened from are
+    written back with save().
+    """
+    def __init__(self, data, node_map, ingested_blocks=None, gap_stats=None, source_hash=None,
+                 live_gap_features=False):
+        x = data.x.cpu().numpy()
+        edge_index = data.edge_index.cpu().numpy()
+        edge_attr = data.edge_attr.cpu().numpy()
+
+        self.num_nodes = x.shape[0]
+        self.num_edges = edge_index.shape[1]
+        self._x = np.array(x, dtype=np.float32)
+        self._edge_index = np.array(edge_index, dtype=np.int64)
+        self._edge_attr = np.array(edge_attr, dtype=np.float32)
+        self.node_map = dict(node_map.items())
+
+        self.gap_features = self._x[0, 3:].copy() if self.num_nodes else np.asarray(
+            timestamp_gap_features(), dtype=np.float32)
+        self.gap_stats = {category: (gap_stats or {}).get(category) for category in GRAPH_TABLES}
+        self.live_gap_features = live_gap_features
+        self.ingested_blocks = dict(ingested_blocks or {})
+        self.source_hash = source_hash
+
+    @classmethod
+    def from_snapshot(cls, path, live_gap_features=False):
+        data, node_map = load_graph_snapshot(path)
+        meta = read_snapshot_meta(path) or {}
+        return cls(data, node_map, meta.get('ingested_blocks'), meta.get('gap_stats'), meta.get('source_hash'),
+                   live_gap_features)
+
+    @property
+    def data(self):
+        """Zero-copy Data view over the live buffers (invalidated by the next append)."""
+        return Data(
+            x=torch.from_numpy(self._x[:self.num_nodes]),
+            edge_index=torch.from_numpy(self._edge_index[:, :self.num_edges]),
+            edge_attr=torch.from_numpy(self._edge_attr[:self.num_edges])
+        )
+
+    def save(self, path, source_hash=None):
+        save_graph_snapshot(
+            self.data, self.node_map, path,
+            source_hash=source_hash if source_hash is not None else self.source_hash,
+            extra_meta={'ingested_blocks': self.ingested_blocks, 'gap_stats': self.gap_stats}
+        )
+
+    def _reserve_nodes(self, extra):
+        needed = self.num_nodes + extra
+        if needed > self._x.shape[0]:
+            capacity = max(needed, 2 * self._x.shape[0], 1024)
+            grown = np.zeros((capacity, self._x.shape[1]), dtype=np.float32)
+            grown[:self.num_nodes] = self._x[:self.num_nodes]
+            self._x = grown
+
+    def _reserve_edges(self, extra):
+        needed = self.num_edges + extra
+        if needed > self._edge_index.shape[1]:
+            capacity = max(needed, 2 * self._edge_index.shape[1], 1024)
+            grown_index = np.zeros((2, capacity), dtype=np.int64)
+            grown_index[:, :self.num_edges] = self._edge_index[:, :self.num_edges]
+            grown_attr = np.zeros((capacity, self._edge_attr.shape[1]), dtype=np.float32)
+            grown_attr[:self.num_edges] = self._edge_attr[:self.num_edges]
+            self._edge_index, self._edge_attr = grown_index, grown_attr
+
+    def add_nodes(self, addresses):
+        """
+        Adds any unseen addresses as isolated nodes and returns the node index of
+        every address passed in.
+        """
+        new_addresses = [a for a in dict.fromkeys(addresses) if a not in self.node_map]
+        if new_addresses:
+            self._reserve_nodes(len(new_addresses))
+            start = self.num_nodes
+            end = start + len(new_addresses)
+            f_counts = pd.Series(new_addresses, dtype=object).str[:6].str.count('f').fillna(0).to_numpy()
+            self._x[start:end, :2] = 0
+            self._x[start:end, 2] = f_counts * 100
+            self._x[start:end, 3:] = self.gap_features
+            self.node_map.update(zip(new_addresses, range(start, end)))
+            self.num_nodes = end
+        return np.fromiter((self.node_map[a] for a in addresses), dtype=np.int64, count=len(addresses))
+
+    def _update_gap_stats(self, timestamps, categories):
+        """
+        Folds a batch into the per-category gap statistics. Min/max gaps are exact
+        while each category's timestamps arrive in time order (Basescan pages are
+        ascending); a timestamp older than the category's latest still updates the
+        count and the mean gap, which only depends on first, last and count.
+        """
+        for category in GRAPH_TABLES:
+            batch = np.sort(timestamps[(categories == category) & (timestamps > 0)])
+            if len(batch) == 0:
+                continue
+            stats = self.gap_stats[category]
+            if stats is None:
+                sequence = batch
+                stats = {'count': 0, 'first': float(batch[0]), 'last': float(batch[0]), 'min_gap': np.inf, 'max_gap': 0.0}
+            elif batch[0] >= stats['last']:
+                sequence = np.concatenate([[stats['last']], batch])
+            else:
+                sequence = batch
+            gaps = np.diff(sequence)
+            if len(gaps):
+                stats['min_gap'] = min(stats['min_gap'], float(gaps.min()))
+                stats['max_gap'] = max(stats['max_gap'], float(gaps.max()))
+            stats['count'] += len(batch)
+            stats['first'] = min(stats['first'], float(batch[0]))
+            stats['last'] = max(stats['last'], float(batch[-1]))
+            self.gap_stats[category] = stats
+
+    def category_gap_features(self):
+        """Min/mean/max gap per category from the running stats, in GRAPH_TABLES order"""
+        features = []
+        for stats in self.gap_stats.values():
+            if stats is None or stats['count'] < 2:
+                features.extend([0.0, 0.0, 0.0])
+            else:
+                mean_gap = (stats['last'] - stats['first']) / (stats['count'] - 1)
+                min_gap = stats['min_gap'] if np.isfinite(stats['min_gap']) else 0.0
+                features.extend([min_gap, mean_gap, stats['max_gap']])
+        return features
+
+    def add_edges(self, src, dst, values, timestamps, categories):
+        """
+        Appends a batch of edges given as parallel arrays (addresses, float values,
+        epoch-second timestamps, GRAPH_TABLES category per edge), creating missing
+        nodes and updating degree and gap features in place.
+
+        Returns:
+            int: number of edges appended
+        """
+        src = np.asarray(src, dtype=object)
+        dst = np.asarray(dst, dtype=object)
+        keep = pd.notna(src) & pd.notna(dst) & (src != '') & (dst != '')
+        if not keep.any():
+            return 0
+        src, dst = src[keep], dst[keep]
+        values = np.asarray(values, dtype=np.float64)[keep]
+        timestamps = np.asarray(timestamps, dtype=np.float64)[keep]
+        categories = np.asarray(categories, dtype=object)[keep]
+
+        # Interleave src/dst so new node ids follow first appearance, as in load_graph_data
+        endpoints = np.column_stack([src, dst]).ravel()
+        codes, uniques = pd.factorize(endpoints)
+        unique_ids = self.add_nodes(uniques.tolist())
+        ids = unique_ids[codes].reshape(-1, 2)
+        src_ids, dst_ids = ids[:, 0], ids[:, 1]
+
+        count = len(src_ids)
+        self._reserve_edges(count)
+        start, end = self.num_edges, self.num_edges + count
+        self._edge_index[0, start:end] = src_ids
+        self._edge_index[1, start:end] = dst_ids
+        self._edge_attr[start:end, 0] = values
+        self._edge_attr[start:end, 1] = timestamps
+        self.num_edges = end
+
+        np.add.at(self._x[:, 0], src_ids, 1)  # Out-degree count for src
+        np.add.at(self._x[:, 1], dst_ids, 1)  # In-degree count for dst
+
+        self._update_gap_stats(timestamps, categories)
+        if self.live_gap_features:
+            self.gap_features = np.asarray(self.category_gap_features(), dtype=np.float32)
+            self._x[:self.num_nodes, 3:] = self.gap_features
+        return count
+
+    def add_rows(self, rows):
+        """Appends a frame shaped like fetch_neighborhood_frame (SRC, DST, VALUE, BLOCK_TIMESTAMP, CATEGORY)."""
+        values = pd.to_numeric(rows['VALUE'], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        return self.add_edges(
+            rows['SRC'].to_numpy(dtype=object),
+            rows['DST'].to_numpy(dtype=object),
+            values,
+            convert_timestamps(rows['BLOCK_TIMESTAMP']),
+            rows['CATEGORY'].to_numpy(dtype=object)
+        )
+
+    def ingest_transactions(self, transactions):
+        """
+        Appends newly fetched Basescan transactions (the dicts returned by
+        fetch_all_transactions / get_wallet_transactions). Native values are in
+        wei and token values in token units, so both are scaled to whole units to
+        match the VALUE_PRECISE / AMOUNT_PRECISE columns of data.db.
+        """
+        if not transactions:
+            return 0
+        df = pd.DataFrame(transactions)
+        categories = df['tx_type'].map(TX_TYPE_CATEGORIES)
+        df = df[categories.notna()]
+        categories = categories[categories.notna()]
+        if df.empty:
+            return 0
+
+        def column(*names):
+            for name in names:
+                if name in df:
+                    return pd.to_numeric(df[name], errors="coerce")
+            return pd.Series(np.nan, index=df.index)
+
+        raw_values = column('value').fillna(0)
+        decimals = column('tokenDecimal', 'token_decimal').where(categories == 'token_transfers').fillna(18)
+        values = (raw_values / np.power(10.0, decimals)).where(categories != 'nft_transfers', 0)
+
+        timestamps = pd.to_numeric(df['timeStamp'], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        return self.add_edges(
+            df['from'].str.lower().to_numpy(dtype=object),
+            df['to'].str.lower().to_numpy(dtype=object),
+            values.to_numpy(dtype=np.float64),
+            timestamps,
+            categories.to_numpy(dtype=object)
+        )
+
+    def ingest_address(self, address, transactions):
+        """
+        Appends the transactions fetched for one wallet that are newer than the
+        last block ingested for it, and advances that watermark.
+
+        Returns:
+            int: number of edges appended
+        """
+        address = address.lower()
+        last_block = self.ingested_blocks.get(address, -1)
+        new_transactions = [tx for tx in transactions if int(tx.get('blockNumber') or 0) > last_block]
+        if not new_transactions:
+            return 0
+        count = self.ingest_transactions(new_transactions)
+        self.ingested_blocks[address] = max(int(tx.get('blockNumber') or 0) for tx in new_transactions)
+        return count
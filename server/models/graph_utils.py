@@ -20,14 +20,6 @@ def convert_timestamp(timestamp):
     except:
         return 0
 
-# Function to calculate timestamp differences
-def calculate_timestamp_differences(timestamps):
-    timestamps = sorted([convert_timestamp(ts) for ts in timestamps if ts])
-    if len(timestamps) < 2:
-        return [0, 0, 0]
-    differences = np.diff(timestamps)
-    return [np.min(differences), np.mean(differences), np.max(differences)]
-
 # Function to query address from database
 def query_address_from_db(db_name, table_name, address_column, address):
     try:
@@ -68,9 +60,188 @@ def find_addresses_for_given_address(address):
         return {}
     return results
 
-# Function to load data from a dataset and construct graph
-# Function to load data from a dataset and construct graph
-def load_graph_data(df, db_name):
+# Tables scanned for neighbourhood rows, with the (FROM, TO) columns they are indexed on
+GRAPH_TABLES = {
+    'transactions': ('FROM_ADDRESS', 'TO_ADDRESS'),
+    'dex_swaps': ('ORIGIN_FROM_ADDRESS', 'ORIGIN_TO_ADDRESS'),
+    'nft_transfers': ('NFT_FROM_ADDRESS', 'NFT_TO_ADDRESS'),
+    'token_transfers': ('ORIGIN_FROM_ADDRESS', 'ORIGIN_TO_ADDRESS'),
+}
+
+# Candidate columns, in the same precedence as the row.get(...) or ... chains below
+SRC_COLUMNS = ['FROM_ADDRESS', 'ORIGIN_FROM_ADDRESS', 'NFT_FROM_ADDRESS']
+DST_COLUMNS = ['TO_ADDRESS', 'ORIGIN_TO_ADDRESS', 'NFT_TO_ADDRESS']
+VALUE_COLUMNS = ['VALUE_PRECISE', 'AMOUNT_PRECISE']
+
+# Function to build a COALESCE over the candidate columns present in a table
+def coalesce_columns(columns, candidates):
+    present = [f"NULLIF({col}, '')" for col in candidates if col in columns]
+    if not present:
+        return "NULL"
+    if len(present) == 1:
+        return present[0]
+    return f"COALESCE({', '.join(present)})"
+
+# Function to load the seed addresses into a temp table on the given connection
+def load_seed_addresses(conn, addresses):
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS temp.seed_addresses")
+    cursor.execute("CREATE TEMP TABLE seed_addresses (ADDRESS TEXT PRIMARY KEY)")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO seed_addresses (ADDRESS) VALUES (?)",
+        ((address,) for address in addresses if address is not None)
+    )
+
+# Function to build the set-based neighbourhood query for one graph table
+def neighborhood_query(conn, category):
+    """
+    Returns a query selecting (SRC, DST, VALUE, BLOCK_TIMESTAMP, SEED) for every
+    row of `category` whose FROM or TO column joins seed_addresses, or None if the
+    table does not exist. Rows matched on both sides are returned once per side,
+    exactly as the per-address lookups do; SEED is the seed address matched.
+    """
+    from_col, to_col = GRAPH_TABLES[category]
+    try:
+        columns = {info[1] for info in conn.execute(f"PRAGMA table_info({category})")}
+    except sqlite3.Error as e:
+        print(f"Error while reading schema of table {category}: {e}")
+        return None
+    if not columns:
+        print(f"Warning: table {category} not found, skipping")
+        return None
+
+    select = (
+        f"SELECT {coalesce_columns(columns, SRC_COLUMNS)} AS SRC, "
+        f"{coalesce_columns(columns, DST_COLUMNS)} AS DST, "
+        f"{coalesce_columns(columns, VALUE_COLUMNS)} AS VALUE, "
+        f"t.BLOCK_TIMESTAMP AS BLOCK_TIMESTAMP, s.ADDRESS AS SEED FROM {category} t "
+    )
+    return (
+        select + f"JOIN seed_addresses s ON t.{from_col} = s.ADDRESS "
+        "UNION ALL " +
+        select + f"JOIN seed_addresses s ON t.{to_col} = s.ADDRESS"
+    )
+
+# Function to read the neighbourhood rows as one DataFrame (SRC, DST, VALUE, BLOCK_TIMESTAMP, SEED, CATEGORY)
+def fetch_neighborhood_frame(conn, addresses):
+    """
+    Loads the seed addresses into a temp table and pulls matching rows from every
+    table in GRAPH_TABLES with set-based JOINs over one connection, instead of two
+    point queries per address per table.
+    """
+    load_seed_addresses(conn, addresses)
+    frames = []
+    try:
+        for category in GRAPH_TABLES:
+            query = neighborhood_query(conn, category)
+            if query is None:
+                continue
+            try:
+                frame = pd.read_sql_query(query, conn)
+            except Exception as e:
+                print(f"Error while querying database table {category}: {e}")
+                continue
+            frame['CATEGORY'] = category
+            frames.append(frame)
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.seed_addresses")
+
+    if not frames:
+        return pd.DataFrame(columns=['SRC', 'DST', 'VALUE', 'BLOCK_TIMESTAMP', 'SEED', 'CATEGORY'])
+    return pd.concat(frames, ignore_index=True)
+
+# Function to convert a column of timestamps to numerical values (vectorized convert_timestamp)
+def convert_timestamps(timestamps):
+    parsed = pd.to_datetime(pd.Series(timestamps), format="%Y-%m-%d %H:%M:%S%z", errors="coerce", utc=True)
+    seconds = (parsed - pd.Timestamp(0, tz="UTC")).dt.total_seconds()
+    return seconds.fillna(0).to_numpy(dtype=np.float64)
+
+# Function to compute the per-category timestamp difference features
+def timestamp_gap_features(num_categories=len(GRAPH_TABLES)):
+    """
+    Min/mean/max gap per category. The original loader computed these from
+    timestamps it had already converted to floats, which convert_timestamp cannot
+    re-parse, so every statistic was 0. The trained checkpoint expects exactly
+    that, so this keeps the zeros; only the number of categories matters.
+    """
+    return [0.0, 0.0, 0.0] * num_categories
+
+# Function to turn collected nodes/edges into a PyG Data object
+def assemble_graph(node_map, node_features, edges, edge_features):
+    # Calculate timestamp differences for each category
+    extra_features = timestamp_gap_features()
+
+    if not edges:  # If no edges were found
+        print("Warning: No edges found in the dataset!")
+        return None, None
+
+    edge_index = torch.tensor(edges, dtype=torch.long).t().contiguous()
+    edge_attr = torch.tensor(edge_features, dtype=torch.float)
+    x = torch.tensor(list(node_features.values()), dtype=torch.float)  # Node features
+
+    # Append extra timestamp features to node features
+    x = torch.cat([x, torch.tensor(extra_features * len(x), dtype=torch.float).view(len(x), -1)], dim=1)
+
+    print(f"Graph data loaded successfully! Nodes: {len(node_map)}, Edges: {len(edges)}")
+    return Data(x=x, edge_index=edge_index, edge_attr=edge_attr), node_map
+
+# Function to construct the graph with NumPy/pandas over the bulk-extracted rows
+def load_graph_data_bulk(df, db_name):
+    """
+    Same graph as the per-address path up to a permutation of nodes and edges
+    (ids follow row order of the bulk query rather than address iteration order),
+    including its seed filter: a seed's rows only count if the seed itself shows
+    up as a (coalesced) source or destination of some fetched row.
+    Built column-wise: addresses are factorized into node ids, timestamps parsed
+    in one call, degrees taken from np.bincount and edge_index/edge_attr created
+    straight from the arrays.
+    """
+    print("Loading graph data (bulk)...")
+    conn = sqlite3.connect(db_name)
+    try:
+        rows = fetch_neighborhood_frame(conn, set(df['ADDRESS']))
+    finally:
+        conn.close()
+
+    # The per-address path skips seeds that are not a source or destination of any
+    # fetched row (a seed matched only through a lower-precedence column)
+    endpoints_seen = pd.concat([rows['SRC'].dropna(), rows['DST'].dropna()]).unique()
+    rows = rows[rows['SEED'].isin(endpoints_seen)]
+
+    # Rows without both endpoints never produce an edge
+    rows = rows[rows['SRC'].notna() & rows['DST'].notna()]
+    if rows.empty:
+        print("Warning: No edges found in the dataset!")
+        return None, None
+
+    # Interleave src/dst so node ids follow first appearance in the rows
+    endpoints = np.column_stack([rows['SRC'].to_numpy(dtype=object), rows['DST'].to_numpy(dtype=object)])
+    codes, uniques = pd.factorize(endpoints.ravel())
+    codes = codes.reshape(-1, 2)
+    src_ids, dst_ids = codes[:, 0], codes[:, 1]
+    num_nodes = len(uniques)
+
+    values = pd.to_numeric(rows['VALUE'], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    timestamps = convert_timestamps(rows['BLOCK_TIMESTAMP'])
+
+    extra_features = np.asarray(timestamp_gap_features(), dtype=np.float32)
+
+    f_counts = pd.Series(uniques, dtype=object).str[:6].str.count('f').fillna(0).to_numpy()
+    x = np.empty((num_nodes, 3 + len(extra_features)), dtype=np.float32)
+    x[:, 0] = np.bincount(src_ids, minlength=num_nodes)  # Out-degree count
+    x[:, 1] = np.bincount(dst_ids, minlength=num_nodes)  # In-degree count
+    x[:, 2] = f_counts * 100
+    x[:, 3:] = extra_features
+
+    edge_index = torch.from_numpy(np.stack([src_ids, dst_ids]).astype(np.int64))
+    edge_attr = torch.from_numpy(np.column_stack([values, timestamps]).astype(np.float32))
+    node_map = dict(zip(uniques.tolist(), range(num_nodes)))
+
+    print(f"Graph data loaded successfully! Nodes: {num_nodes}, Edges: {edge_index.size(1)}")
+    return Data(x=torch.from_numpy(x), edge_index=edge_index, edge_attr=edge_attr), node_map
+
+# Function to construct the graph with per-address point queries (legacy path)
+def load_graph_data_per_address(df, db_name):
     counter = 0
     print("Loading graph data...")
     conn = sqlite3.connect(db_name)
@@ -79,7 +250,6 @@ def load_graph_data(df, db_name):
     node_map = {}  # Maps address to node_index
     node_index = 0  # Tracks the current node index
     node_features = {}  # Stores features for each node
-    timestamp_data = {category: [] for category in ['transactions', 'dex_swaps', 'nft_transfers', 'token_transfers']}
     node_degrees = {}  # To track if a node has at least one edge
     
     addresses = set(df['ADDRESS'])
@@ -129,7 +299,6 @@ def load_graph_data(df, db_name):
                         
                     value = float(row.get('VALUE_PRECISE', 0) or row.get('AMOUNT_PRECISE', 0) or 0)
                     timestamp = convert_timestamp(row['BLOCK_TIMESTAMP'])
-                    timestamp_data[category].append(timestamp)
                     
                     # Handle source node
                     if src not in node_map:
@@ -153,21 +322,10 @@ def load_graph_data(df, db_name):
     
     conn.close()
     
-    # Calculate timestamp differences for each category
-    extra_features = []
-    for category in ['transactions', 'dex_swaps', 'nft_transfers', 'token_transfers']:
-        extra_features.extend(calculate_timestamp_differences(timestamp_data[category]))
-    
-    if not edges:  # If no edges were found
-        print("Warning: No edges found in the dataset!")
-        return None, None
-    
-    edge_index = torch.tensor(edges, dtype=torch.long).t().contiguous()
-    edge_attr = torch.tensor(edge_features, dtype=torch.float)
-    x = torch.tensor(list(node_features.values()), dtype=torch.float)  # Node features
-    
-    # Append extra timestamp features to node features
-    x = torch.cat([x, torch.tensor(extra_features * len(x), dtype=torch.float).view(len(x), -1)], dim=1)
-    
-    print(f"Graph data loaded successfully! Nodes: {len(node_map)}, Edges: {len(edges)}")
-    return Data(x=x, edge_index=edge_index, edge_attr=edge_attr), node_map
\ No newline at end of file
+    return assemble_graph(node_map, node_features, edges, edge_features)
+
+# Function to load data from a dataset and construct graph
+def load_graph_data(df, db_name, bulk=True):
+    if bulk:
+        return load_graph_data_bulk(df, db_name)
+    return load_graph_data_per_address(df, db_name)
@@ -0,0 +1,109 @@
+# subgraph.py
+import os
+import torch
+import numpy as np
+from torch_geometric.data import Data
+
+CSR_ARRAYS = ['csr_rowptr', 'csr_col', 'csr_perm']
+
+# Function to gather the CSR slices of several rows without a Python loop
+def gather_rows(rowptr, rows):
+    starts = rowptr[rows]
+    lengths = rowptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(total, dtype=np.int64) - np.repeat(offsets, lengths) + np.repeat(starts, lengths)
+
+class CSRGraphIndex:
+    """
+    Incoming-edge CSR over a graph's edge_index: row i lists the sources of every
+    edge pointing at node i. That is the direction messages flow in
+    EnhancedFraudGNN, so the k-hop in-neighbourhood of a node is exactly what
+    its k-layer score depends on.
+    """
+    def __init__(self, rowptr, col, perm):
+        self.rowptr = rowptr  # (num_nodes + 1,) offsets into col
+        self.col = col        # Source node of each edge, grouped by target
+        self.perm = perm      # Original edge id of each CSR entry
+
+    @property
+    def num_nodes(self):
+        return len(self.rowptr) - 1
+
+    @classmethod
+    def from_edge_index(cls, edge_index, num_nodes):
+        edge_index = edge_index.cpu().numpy() if isinstance(edge_index, torch.Tensor) else np.asarray(edge_index)
+        src, dst = edge_index[0], edge_index[1]
+        perm = np.argsort(dst, kind='stable').astype(np.int64)
+        rowptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=num_nodes), out=rowptr[1:])
+        return cls(rowptr, src[perm].astype(np.int64), perm)
+
+    def save(self, path):
+        for name, array in zip(CSR_ARRAYS, (self.rowptr, self.col, self.perm)):
+            np.save(os.path.join(path, f"{name}.npy"), array)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mmap_mode = 'r' if mmap else None
+        return cls(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in CSR_ARRAYS))
+
+    def k_hop_subgraph(self, node_idx, num_hops):
+        """
+        CSR counterpart of torch_geometric.utils.k_hop_subgraph (flow
+        'source_to_target', relabel_nodes=True) that only touches the edges of
+        the neighbourhood instead of scanning the whole edge_index every hop.
+
+        Returns:
+            tuple: (subset, sub_edge_index, edge_ids, mapping) where subset holds the
+            sorted global node ids, sub_edge_index is relabelled to positions in
+            subset, edge_ids are the original edge ids and mapping gives the
+            position of each requested node in subset.
+        """
+        seeds = np.atleast_1d(np.asarray(node_idx, dtype=np.int64))
+        subset = np.unique(seeds)
+        frontier = subset
+        for _ in range(num_hops):
+            neighbors = self.col[gather_rows(self.rowptr, frontier)]
+            frontier = np.setdiff1d(neighbors, subset)
+            if len(frontier) == 0:
+                break
+            subset = np.union1d(subset, frontier)
+
+        # Every in-edge of the subset whose source is also in the subset
+        positions = gather_rows(self.rowptr, subset)
+        sources = self.col[positions]
+        local_src = np.searchsorted(subset, sources)
+        inside = local_src < len(subset)
+        inside[inside] = subset[local_src[inside]] == sources[inside]
+        targets = np.repeat(np.arange(len(subset), dtype=np.int64), np.diff(self.rowptr)[subset])
+
+        edge_ids = self.perm[positions[inside]]
+        order = np.argsort(edge_ids, kind='stable')
+        sub_edge_index = np.stack([local_src[inside][order], targets[inside][order]])
+        mapping = np.searchsorted(subset, seeds)
+        return subset, sub_edge_index, edge_ids[order], mapping
+
+    def subgraph_data(self, data, node_idx, num_hops):
+        """Returns (Data, mapping) for the k-hop neighbourhood of node_idx."""
+        subset, sub_edge_index, edge_ids, mapping = self.k_hop_subgraph(node_idx, num_hops)
+        subset_t = torch.from_numpy(subset)
+        sub_data = Data(
+            x=data.x[subset_t],
+            edge_index=torch.from_numpy(sub_edge_index),
+            edge_attr=data.edge_attr[torch.from_numpy(edge_ids)] if data.edge_attr is not None else None
+        )
+        return sub_data, torch.from_numpy(mapping)
+
+# Function to reuse the CSR index stored with a snapshot, building it if missing
+def load_or_build_index(path, data):
+    if all(os.path.exists(os.path.join(path, f"{name}.npy")) for name in CSR_ARRAYS):
+        index = CSRGraphIndex.load(path)
+        if index.num_nodes == data.x.size(0) and len(index.col) == data.edge_index.size(1):
+            return index
+    index = CSRGraphIndex.from_edge_index(data.edge_index, data.x.size(0))
+    if os.path.isdir(path):
+        index.save(path)
+    return index
@@ -3,7 +3,7 @@ import torch
 import pandas as pd
 from torch_geometric.data import Data
 from models.gnn_model import EnhancedFraudGNN
-from models.graph_utils import load_graph_data
+from models.graph_snapshot import load_or_build_graph
 from models.train_utils import train
 from models.test_utils import test
 
@@ -11,7 +11,7 @@ create_single_db_from_csv()
 
 # Load datasets
 train_df = pd.read_csv('Data/train_addresses.csv')
-data, node_map = load_graph_data(train_df, 'data.db')
+data, node_map = load_or_build_graph(train_df, 'data.db', 'graph_snapshots/train')
 
 train_labels = torch.full((len(node_map),), 0.5)
 for _, row in train_df.iterrows():
@@ -1,4 +1,4 @@
-from models.graph_utils import load_graph_data
+from models.graph_snapshot import load_or_build_graph
 import pandas as pd
 import torch
 from tqdm import tqdm  # Correct import
@@ -7,7 +7,7 @@ import numpy as np
 def test(model, threshold=0.5):
     # Load test dataset and construct graph
     test_df = pd.read_csv('Data/test_addresses.csv')
-    test_data, test_node_map = load_graph_data(test_df, 'data.db')
+    test_data, test_node_map = load_or_build_graph(test_df, 'data.db', 'graph_snapshots/test')
 
     # Predict using trained model
     model.eval()
@@ -0,0 +1,210 @@
+import aiohttp
+import asyncio
+import time
+import sys
+import os
+from typing import List, Dict, Optional
+
+BASESCAN_API_URL = os.getenv("BASESCAN_API_URL", "https://api.basescan.org/api")
+BASESCAN_RATE_LIMIT = float(os.getenv("BASESCAN_RATE_LIMIT", "5"))  # Requests per second allowed by the API key
+BASESCAN_MAX_CONNECTIONS = int(os.getenv("BASESCAN_MAX_CONNECTIONS", "20"))
+
+TRANSACTION_ACTIONS = ["txlist", "tokentx", "tokennfttx", "txlistinternal"]
+RESULT_WINDOW = 10000   # Basescan rejects page * offset above this, whatever the block range
+PAGE_SIZE = 1000        # Offset per page, so a window holds RESULT_WINDOW // PAGE_SIZE pages
+PARALLEL_PAGES = 4      # Pages requested at once after the first full page
+START_BLOCK = 0
+END_BLOCK = 99999999
+MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class BasescanClient:
+    """
+    Async Basescan client sharing one pooled keep-alive aiohttp session.
+    Actions are fetched concurrently, pages after the first are requested in
+    parallel, and every request goes through a token bucket sized to the API
+    key's quota. Histories longer than Basescan's 10,000-result window are read
+    as successive windows over narrowing block ranges.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_url: str = BASESCAN_API_URL,
+                 rate_limit: float = BASESCAN_RATE_LIMIT, max_connections: int = BASESCAN_MAX_CONNECTIONS,
+                 timeout: float = 30):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_limit)
+        self._session = None
+        self._loop = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+            self.bucket._lock = asyncio.Lock()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, params: Dict) -> Dict:
+        """GET the API with rate limiting; retries when Basescan reports its rate limit."""
+        session = await self._get_session()
+        # Read the key per request: main.py only loads .env at startup, after imports
+        api_key = self.api_key or os.getenv("BASESCAN_API_KEY")
+        params = {**params, "apikey": api_key} if api_key else params
+        data = {}
+        for attempt in range(MAX_RETRIES):
+            await self.bucket.acquire()
+            async with session.get(self.api_url, params=params) as response:
+                data = await response.json(content_type=None)
+            result = data.get("result")
+            if data.get("status") != "1" and isinstance(result, str) and "rate limit" in result.lower():
+                await asyncio.sleep(0.5 * (attempt + 1))
+                continue
+            break
+        return data
+
+    async def fetch_page(self, address: str, action: str, page: Optional[int] = None,
+                         offset: Optional[int] = None, sort: str = "asc",
+                         startblock: int = START_BLOCK, endblock: int = END_BLOCK) -> List[dict]:
+        params = {
+            "module": "account",
+            "action": action,
+            "address": address,
+            "startblock": startblock,
+            "endblock": endblock,
+            "sort": sort,
+        }
+        if page is not None:
+            params["page"] = page
+            params["offset"] = offset or PAGE_SIZE
+
+        data = await self.request(params)
+        if data.get("status") != "1":
+            if page in (None, 1):
+                print(f"Warning: No results from action={action}: {data.get('message')}", file=sys.stderr)
+            return []
+        result = data.get("result", [])
+        return result if isinstance(result, list) else []
+
+    async def fetch_window(self, address: str, action: str, sort: str, page_size: int, parallel_pages: int,
+                           startblock: int, endblock: int) -> List[dict]:
+        """
+        Fetch up to RESULT_WINDOW results of one block range. Once the first page
+        comes back full the next `parallel_pages` pages are requested together,
+        until one comes back short or the window is exhausted.
+        """
+        num_pages = max(RESULT_WINDOW // page_size, 1)
+        results = await self.fetch_page(address, action, page=1, offset=page_size, sort=sort,
+                                        startblock=startblock, endblock=endblock)
+        if len(results) < page_size:
+            return results
+
+        next_page = 2
+        while next_page <= num_pages:
+            pages = await asyncio.gather(*[
+                self.fetch_page(address, action, page=page, offset=page_size, sort=sort,
+                                startblock=startblock, endblock=endblock)
+                for page in range(next_page, min(next_page + parallel_pages, num_pages + 1))
+            ])
+            for page in pages:
+                results.extend(page)
+                if len(page) < page_size:
+                    return results
+            next_page += parallel_pages
+        return results
+
+    async def fetch_action(self, address: str, action: str, sort: str = "asc", paginate: bool = True,
+                           page_size: int = PAGE_SIZE, parallel_pages: int = PARALLEL_PAGES,
+                           startblock: int = START_BLOCK, endblock: int = END_BLOCK) -> List[dict]:
+        """
+        Fetch one action. Without pagination this is a single request (Basescan's
+        default cap). With pagination, pages are read a result window at a time;
+        when a window comes back full the next one starts at the block it ended
+        on (the end for sort="desc"), and that boundary block is dropped from the
+        finished window so it is read once, in full, by the next.
+        """
+        if not paginate:
+            return await self.fetch_page(address, action, sort=sort, startblock=startblock, endblock=endblock)
+
+        window_size = max(RESULT_WINDOW // page_size, 1) * page_size
+        results = []
+        while True:
+            window = await self.fetch_window(address, action, sort, page_size, parallel_pages, startblock, endblock)
+            if len(window) < window_size:
+                results.extend(window)
+                return results
+
+            boundary = int(window[-1].get("blockNumber", 0))
+            complete = [tx for tx in window if int(tx.get("blockNumber", 0)) != boundary]
+            if not complete:
+                # A single block fills the whole window; keep what fits and move past it
+                print(f"Warning: block {boundary} has more than {window_size} {action} results for {address}",
+                      file=sys.stderr)
+                results.extend(window)
+                boundary += -1 if sort == "desc" else 1
+            else:
+                results.extend(complete)
+
+            if sort == "desc":
+                endblock = boundary
+            else:
+                startblock = boundary
+            if startblock > endblock:
+                return results
+
+    async def fetch_actions(self, address: str, actions: List[str] = TRANSACTION_ACTIONS,
+                            **kwargs) -> Dict[str, List[dict]]:
+        """Fetch several actions concurrently; a failing action yields an empty list."""
+        results = await asyncio.gather(
+            *[self.fetch_action(address, action, **kwargs) for action in actions],
+            return_exceptions=True
+        )
+        fetched = {}
+        for action, result in zip(actions, results):
+            if isinstance(result, Exception):
+                print(f"Error while fetching action={action} for {address}: {result}", file=sys.stderr)
+                result = []
+            fetched[action] = result
+        return fetched
+
+
+_client = None
+
+
+def get_basescan_client() -> BasescanClient:
+    """Process-wide client, so every caller shares one connection pool and rate limit."""
+    global _client
+    if _client is None:
+        _client = BasescanClient()
+    return _client
@@ -0,0 +1,79 @@
+import asyncio
+import random
+import time
+import numpy as np
+from aiohttp import web
+from scraping.basescan_client import BasescanClient, RESULT_WINDOW
+
+# Stub server behaviour
+STUB_PORT = 8766
+STUB_LATENCY = 0.05       # Seconds per page
+TXS_PER_BLOCK = 3         # Several rows per block exercise the window boundary handling
+
+NUM_ADDRESSES = 8
+HISTORY_SIZES = [50, 2500, 12000, 31000]  # Rows per address, cycled; above RESULT_WINDOW needs several windows
+RATE_LIMIT = 200          # Requests per second for the client's token bucket
+
+def make_history(size):
+    return [{"hash": f"0x{i:064x}", "blockNumber": str(1000 + i // TXS_PER_BLOCK), "from": "0xa", "to": "0xb",
+             "value": "1", "timeStamp": str(1700000000 + i)} for i in range(size)]
+
+HISTORIES = {f"0x{i:040x}": make_history(HISTORY_SIZES[i % len(HISTORY_SIZES)]) for i in range(NUM_ADDRESSES)}
+
+async def stub_handler(request):
+    """Basescan-shaped txlist pages, including its page * offset <= 10000 limit"""
+    query = request.query
+    await asyncio.sleep(STUB_LATENCY)
+    page, offset = int(query.get("page", 1)), int(query.get("offset", RESULT_WINDOW))
+    if page * offset > RESULT_WINDOW:
+        return web.json_response({"status": "0", "message": "NOTOK",
+                                  "result": "Result window is too large, PageNo x Offset size must be less than or equal to 10000"})
+    start, end = int(query.get("startblock", 0)), int(query.get("endblock", 99999999))
+    rows = [tx for tx in HISTORIES.get(query["address"], []) if start <= int(tx["blockNumber"]) <= end]
+    if query.get("sort") == "desc":
+        rows = rows[::-1]
+    rows = rows[(page - 1) * offset:page * offset]
+    if not rows:
+        return web.json_response({"status": "0", "message": "No transactions found", "result": []})
+    return web.json_response({"status": "1", "message": "OK", "result": rows})
+
+async def start_stub(port=STUB_PORT):
+    app = web.Application()
+    app.router.add_get("/api", stub_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+async def main():
+    runner = await start_stub()
+    client = BasescanClient(api_key="stub", api_url=f"http://127.0.0.1:{STUB_PORT}/api", rate_limit=RATE_LIMIT)
+    addresses = list(HISTORIES)
+    random.shuffle(addresses)
+    latencies = []
+    incomplete = 0
+
+    async def one(address, sort):
+        nonlocal incomplete
+        start = time.perf_counter()
+        transactions = await client.fetch_action(address, "txlist", sort=sort)
+        latencies.append(time.perf_counter() - start)
+        hashes = [tx["hash"] for tx in transactions]
+        if len(hashes) != len(set(hashes)) or set(hashes) != {tx["hash"] for tx in HISTORIES[address]}:
+            incomplete += 1
+
+    print(f"Fetching {NUM_ADDRESSES} histories of {HISTORY_SIZES} rows, ascending and descending...")
+    start = time.perf_counter()
+    await asyncio.gather(*[one(address, sort) for address in addresses for sort in ("asc", "desc")])
+    elapsed = time.perf_counter() - start
+
+    rows = 2 * sum(len(history) for history in HISTORIES.values())
+    latencies = np.array(latencies) * 1000
+    print(f"{rows / elapsed:.0f} rows/s | p50 {np.percentile(latencies, 50):.1f} ms | "
+          f"p99 {np.percentile(latencies, 99):.1f} ms | incomplete or duplicated histories {incomplete}")
+    await client.close()
+    await runner.cleanup()
+
+# python -m scraping.benchmark_basescan (from server/)
+if __name__ == "__main__":
+    asyncio.run(main())
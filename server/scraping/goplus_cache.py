@@ -0,0 +1,42 @@
+import os
+from utils.result_cache import TTLResultCache
+from scraping.token_address_scrape import scrape_token_features
+from scraping.wallet_address_scrape import scrape_wallet_features
+from utils.risk_features import WalletRiskFeatures, TokenRiskFeatures, features_to_dict, features_from_dict
+
+GOPLUS_CACHE_FRESH = float(os.getenv("GOPLUS_CACHE_FRESH", "600"))          # Seconds a lookup is served as-is
+GOPLUS_CACHE_MAX_STALE = float(os.getenv("GOPLUS_CACHE_MAX_STALE", "86400"))  # Seconds it may be served while refreshing
+GOPLUS_CACHE_SIZE = int(os.getenv("GOPLUS_CACHE_SIZE", "4096"))
+GOPLUS_CACHE_VERSION = "2"  # Bump when the scrapers' output format changes
+
+_caches = {}
+
+def get_goplus_cache(kind: str) -> TTLResultCache:
+    """One cache per lookup kind ("wallet_features" or "token_features"), sharing the optional GOPLUS_CACHE_DB file"""
+    if kind not in _caches:
+        _caches[kind] = TTLResultCache(
+            version=GOPLUS_CACHE_VERSION,
+            fresh_for=GOPLUS_CACHE_FRESH,
+            max_stale=GOPLUS_CACHE_MAX_STALE,
+            max_entries=GOPLUS_CACHE_SIZE,
+            db_path=os.getenv("GOPLUS_CACHE_DB"),
+            table=f"goplus_{kind}_cache"
+        )
+    return _caches[kind]
+
+async def cached_wallet_features(address: str) -> WalletRiskFeatures:
+    """scrape_wallet_features behind the GoPlus TTL cache (stored as plain dicts)"""
+    async def fetch():
+        return features_to_dict(await scrape_wallet_features(address))
+    data = await get_goplus_cache("wallet_features").get_or_fetch(address.lower(), fetch)
+    return features_from_dict(WalletRiskFeatures, data)
+
+async def cached_token_features(chain_id: str, address: str) -> TokenRiskFeatures:
+    """scrape_token_features behind the GoPlus TTL cache (stored as plain dicts)"""
+    async def fetch():
+        return features_to_dict(await scrape_token_features(chain_id, address))
+    data = await get_goplus_cache("token_features").get_or_fetch(f"{chain_id}:{address.lower()}", fetch)
+    return features_from_dict(TokenRiskFeatures, data)
+
+def goplus_cache_stats():
+    return {kind: cache.stats() for kind, cache in _caches.items()}
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+GOPLUS_WORKERS = int(os.getenv("GOPLUS_WORKERS", "8"))               # Concurrent blocking SDK calls
+GOPLUS_CALL_TIMEOUT = float(os.getenv("GOPLUS_CALL_TIMEOUT", "15"))  # Seconds, including time queued
+
+
+class GoPlusExecutor:
+    """
+    Runs the synchronous GoPlus SDK on a bounded dedicated thread pool, so
+    lookups never block the event loop or crowd out the default executor.
+    Each call is awaited with a timeout and the pool records queue depth and
+    time spent waiting for a worker.
+
+    A timed-out call cannot be interrupted inside its thread; pass the SDK's
+    own _request_timeout as well so the worker is freed too.
+    """
+
+    def __init__(self, max_workers: int = GOPLUS_WORKERS, timeout: float = GOPLUS_CALL_TIMEOUT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="goplus")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.started = 0
+        self.running = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _timed(self, func, submitted):
+        started = time.monotonic()
+        wait = started - submitted
+        with self._lock:
+            self.queued -= 1
+            self.started += 1
+            self.running += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.total_run += time.monotonic() - started
+
+    async def run(self, func, *args, timeout: float = None, **kwargs):
+        """Await func(*args, **kwargs) on the pool; raises asyncio.TimeoutError after `timeout` seconds"""
+        with self._lock:
+            self.queued += 1
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._timed, functools.partial(func, *args, **kwargs), time.monotonic()
+        )
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.started * 1000 if self.started else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "avg_call_ms": self.total_run / self.completed * 1000 if self.completed else 0.0,
+            }
+
+
+_executor = None
+
+
+def get_goplus_executor() -> GoPlusExecutor:
+    """Process-wide pool, so every GoPlus lookup shares one bound and one set of metrics."""
+    global _executor
+    if _executor is None:
+        _executor = GoPlusExecutor()
+    return _executor
+
+
+async def goplus_call(func, *args, timeout: float = None, **kwargs):
+    """Run one blocking GoPlus SDK call on the shared pool"""
+    return await get_goplus_executor().run(func, *args, timeout=timeout, **kwargs)
+
+
+def shutdown_goplus_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
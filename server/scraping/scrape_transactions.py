@@ -1,11 +1,6 @@
-import requests
 from typing import List, Optional
 from datetime import datetime
-import sys
-import os
-
-BASESCAN_API_KEY = os.getenv("BASESCAN_API_KEY")
-BASESCAN_API_URL = "https://api.basescan.org/api"
+from scraping.basescan_client import get_basescan_client
 
 
 async def get_wallet_transactions(wallet_address: str, token_address: Optional[str] = None, top_n: int = 10) -> List[dict]:
@@ -14,27 +9,15 @@ async def get_wallet_transactions(wallet_address: str, token_address: Optional[s
     Optionally filter by token address.
     """
 
-    def fetch_api_data(action: str) -> List[dict]:
-        params = {
-            "module": "account",
-            "action": action,
-            "address": wallet_address,
-            "startblock": 0,
-            "endblock": 99999999,
-            "sort": "desc",
-            "apikey": BASESCAN_API_KEY
-        }
-        response = requests.get(BASESCAN_API_URL, params=params)
-        data = response.json()
-        if data.get("status") != "1":
-            print(f"Warning: No results from action={action}: {data.get('message')}", file=sys.stderr)
-            return []
-        return data.get("result", [])
+    # Fetch all three actions concurrently over the shared pooled client
+    fetched = await get_basescan_client().fetch_actions(
+        wallet_address, ["txlist", "tokentx", "tokennfttx"], sort="desc", paginate=False
+    )
 
     all_results = []
 
     # Normal transactions (Base native)
-    for tx in fetch_api_data("txlist"):
+    for tx in fetched["txlist"]:
         enriched_tx = {
             "tx_type": "normal",
             "hash": tx.get("hash"),
@@ -52,7 +35,7 @@ async def get_wallet_transactions(wallet_address: str, token_address: Optional[s
         all_results.append(enriched_tx)
 
     # ERC20 token transfers
-    for tx in fetch_api_data("tokentx"):
+    for tx in fetched["tokentx"]:
         enriched_tx = {
             "tx_type": "erc20",
             "hash": tx.get("hash"),
@@ -69,7 +52,7 @@ async def get_wallet_transactions(wallet_address: str, token_address: Optional[s
         all_results.append(enriched_tx)
 
     # NFT transfers
-    for tx in fetch_api_data("tokennfttx"):
+    for tx in fetched["tokennfttx"]:
         enriched_tx = {
             "tx_type": "nft",
             "hash": tx.get("hash"),
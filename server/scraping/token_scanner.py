@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+from scraping.basescan_client import TokenBucket
+from scraping.token_address_scrape import fetch_token_security
+from scraping.goplus_executor import goplus_call
+from utils.risk_features import TokenRiskFeatures, TOKEN_RECORD_DTYPE, to_records
+
+GOPLUS_MAX_BATCH = int(os.getenv("GOPLUS_MAX_BATCH", "100"))           # Addresses per token_security call
+GOPLUS_RATE_LIMIT = float(os.getenv("GOPLUS_RATE_LIMIT", "0.5"))        # Calls per second (30/min free tier)
+GOPLUS_SCAN_CONCURRENCY = int(os.getenv("GOPLUS_SCAN_CONCURRENCY", "4"))
+TOKEN_SCAN_DB = os.getenv("TOKEN_SCAN_DB", os.path.join("data", "token_security.db"))
+TOKEN_SCAN_MAX_AGE = float(os.getenv("TOKEN_SCAN_MAX_AGE", "3600"))    # Seconds before a stored result is rescanned
+MAX_FINISHED_JOBS = 100
+
+
+class TokenSecurityStore:
+    """SQLite table of the latest GoPlus token_security fields per (chain, token)."""
+
+    def __init__(self, db_path: str = TOKEN_SCAN_DB):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_security ("
+            "chain_id TEXT, address TEXT, data TEXT, fetched REAL, PRIMARY KEY (chain_id, address))"
+        )
+        self._conn.commit()
+
+    def upsert_many(self, chain_id: str, results: Dict[str, dict]):
+        fetched = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO token_security (chain_id, address, data, fetched) VALUES (?, ?, ?, ?)",
+                [(chain_id, address, json.dumps(data), fetched) for address, data in results.items()]
+            )
+            self._conn.commit()
+
+    def get_many(self, chain_id: str, addresses: List[str], max_age: Optional[float] = None) -> Dict[str, dict]:
+        """Stored results for the given addresses (only those fetched within max_age seconds, if given)"""
+        oldest = time.time() - max_age if max_age is not None else 0
+        found = {}
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(addresses), 500):
+                chunk = addresses[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT address, data FROM token_security WHERE chain_id = ? AND fetched >= ? "
+                    f"AND address IN ({','.join('?' * len(chunk))})",
+                    (chain_id, oldest, *chunk)
+                ).fetchall()
+                found.update((address, json.loads(data)) for address, data in rows)
+        return found
+
+    def feature_records(self, chain_id: Optional[str] = None):
+        """Every stored token as a TOKEN_RECORD_DTYPE structured array (tokens GoPlus had no data for are skipped)"""
+        with self._lock:
+            if chain_id is None:
+                rows = self._conn.execute("SELECT chain_id, address, data FROM token_security").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT chain_id, address, data FROM token_security WHERE chain_id = ?", (chain_id,)
+                ).fetchall()
+        features = (
+            TokenRiskFeatures.from_goplus(address, json.loads(data), chain_id=chain)
+            for chain, address, data in rows if data != "null"
+        )
+        return to_records(features, TOKEN_RECORD_DTYPE)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM token_security").fetchone()[0]
+
+
+class TokenScanner:
+    """
+    Bulk GoPlus token security scans.
+
+    Token lists are deduplicated, tokens with a result younger than max_age are
+    served from the store, and the rest are split into GOPLUS_MAX_BATCH-address
+    calls run concurrently (at most GOPLUS_SCAN_CONCURRENCY at once, paced by a
+    token bucket). Large scans can run as background jobs polled by id.
+
+    SQLite reads and writes run in worker threads, off the event loop. Tokens of
+    a failed GoPlus call are not stored (so the next scan retries them) and are
+    reported as {"error": ...} rather than None.
+    """
+
+    def __init__(self, store: TokenSecurityStore, batch_size: int = GOPLUS_MAX_BATCH,
+                 rate_limit: float = GOPLUS_RATE_LIMIT, concurrency: int = GOPLUS_SCAN_CONCURRENCY):
+        self.store = store
+        self.batch_size = batch_size
+        self.bucket = TokenBucket(rate_limit)
+        self.concurrency = concurrency
+        self.calls = 0
+        self.failed_calls = 0
+        self.jobs = {}
+        self._tasks = set()
+
+    async def _fetch_batch(self, chain_id: str, batch: List[str], semaphore: asyncio.Semaphore,
+                           raw_archive: Optional[list] = None):
+        """Fetch and store one batch; returns {address: {"error": ...}} for a failed call, else {}"""
+        async with semaphore:
+            await self.bucket.acquire()
+            self.calls += 1
+            try:
+                results = await goplus_call(fetch_token_security, chain_id, batch, raw_archive=raw_archive)
+            except Exception as e:
+                print(f"Error while scanning {len(batch)} tokens on chain {chain_id}: {e!r}")
+                self.failed_calls += 1
+                error = {"error": f"GoPlus lookup failed: {str(e) or type(e).__name__}"}
+                return {address: error for address in batch}
+        # Tokens GoPlus does not know are stored as None so they are not rescanned until max_age
+        await asyncio.to_thread(self.store.upsert_many, chain_id, {address: results.get(address) for address in batch})
+        return {}
+
+    async def scan(self, chain_id: str, addresses: List[str], max_age: float = TOKEN_SCAN_MAX_AGE,
+                   progress: Optional[dict] = None, raw_archive: Optional[list] = None) -> Dict[str, Optional[dict]]:
+        """
+        Raw GoPlus responses of the calls this scan makes are appended to
+        raw_archive when one is passed (tokens served from the store have none).
+
+        Returns:
+            dict: { lowercase token address: security fields, None if GoPlus has no
+                    result, or {"error": message} if its GoPlus call failed }
+        """
+        addresses = list(dict.fromkeys(address.lower() for address in addresses if address))
+        fresh = await asyncio.to_thread(self.store.get_many, chain_id, addresses, max_age)
+        missing = [address for address in addresses if address not in fresh]
+        batches = [missing[start:start + self.batch_size] for start in range(0, len(missing), self.batch_size)]
+        if progress is not None:
+            progress.update({"tokens": len(addresses), "cached": len(fresh), "batches": len(batches), "batches_done": 0})
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failed = {}
+
+        async def fetch(batch):
+            failed.update(await self._fetch_batch(chain_id, batch, semaphore, raw_archive))
+            if progress is not None:
+                progress["batches_done"] += 1
+
+        await asyncio.gather(*[fetch(batch) for batch in batches])
+        if progress is not None:
+            progress["failed"] = len(failed)
+
+        results = fresh
+        if missing:
+            results = {**fresh, **await asyncio.to_thread(self.store.get_many, chain_id, missing), **failed}
+        return {address: results.get(address) for address in addresses}
+
+    def submit(self, chain_id: str, addresses: List[str], max_age: float = TOKEN_SCAN_MAX_AGE,
+               include_raw: bool = False) -> str:
+        """Start a background scan and return its job id (with include_raw, the job keeps a "raw" archive)"""
+        job_id = uuid.uuid4().hex
+        job = {"id": job_id, "status": "running", "chain_id": chain_id, "started": time.time()}
+        if include_raw:
+            job["raw"] = []
+        self.jobs[job_id] = job
+
+        async def run():
+            try:
+                job["results"] = await self.scan(chain_id, addresses, max_age, progress=job, raw_archive=job.get("raw"))
+                job["status"] = "done"
+            except Exception as e:
+                job["status"] = "error"
+                job["error"] = str(e)
+            job["finished"] = time.time()
+            self._prune_jobs()
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    def _prune_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] != "running"]
+        for job_id in finished[:-MAX_FINISHED_JOBS]:
+            del self.jobs[job_id]
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "stored_tokens": self.store.count(),
+            "goplus_calls": self.calls,
+            "failed_calls": self.failed_calls,
+            "running_jobs": sum(job["status"] == "running" for job in self.jobs.values()),
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+        }
+
+
+_scanner = None
+
+
+def get_token_scanner() -> TokenScanner:
+    """Process-wide scanner, so every scan shares one rate limit and store."""
+    global _scanner
+    if _scanner is None:
+        _scanner = TokenScanner(TokenSecurityStore())
+    return _scanner
+
+
+async def stop_token_scanner():
+    """Cancel running background scans (without creating the scanner if it was never used)."""
+    if _scanner is not None:
+        await _scanner.stop()
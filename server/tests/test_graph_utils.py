@@ -0,0 +1,74 @@
+import random
+import sqlite3
+import pandas as pd
+import pytest
+import torch
+from models.graph_utils import load_graph_data_bulk, load_graph_data_per_address
+
+TS = "2024-03-1{} 1{}:00:00+0000"
+
+def make_db(path, token_rows, transaction_rows=(), dex_rows=(), nft_rows=()):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE transactions (FROM_ADDRESS TEXT, TO_ADDRESS TEXT, VALUE_PRECISE TEXT, BLOCK_TIMESTAMP TEXT)")
+    conn.execute("CREATE TABLE dex_swaps (ORIGIN_FROM_ADDRESS TEXT, ORIGIN_TO_ADDRESS TEXT, AMOUNT_PRECISE TEXT, BLOCK_TIMESTAMP TEXT)")
+    conn.execute("CREATE TABLE nft_transfers (NFT_FROM_ADDRESS TEXT, NFT_TO_ADDRESS TEXT, BLOCK_TIMESTAMP TEXT)")
+    conn.execute(
+        "CREATE TABLE token_transfers (FROM_ADDRESS TEXT, TO_ADDRESS TEXT, ORIGIN_FROM_ADDRESS TEXT, "
+        "ORIGIN_TO_ADDRESS TEXT, AMOUNT_PRECISE TEXT, BLOCK_TIMESTAMP TEXT)"
+    )
+    conn.executemany("INSERT INTO transactions VALUES (?,?,?,?)", transaction_rows)
+    conn.executemany("INSERT INTO dex_swaps VALUES (?,?,?,?)", dex_rows)
+    conn.executemany("INSERT INTO nft_transfers VALUES (?,?,?)", nft_rows)
+    conn.executemany("INSERT INTO token_transfers VALUES (?,?,?,?,?,?)", token_rows)
+    conn.commit()
+    conn.close()
+
+def canonical(data, node_map):
+    """Node features keyed by address and a sorted edge list, i.e. the graph up to permutation."""
+    addresses = {index: address for address, index in node_map.items()}
+    nodes = {address: data.x[index].tolist() for address, index in node_map.items()}
+    edges = sorted(zip(
+        [addresses[i] for i in data.edge_index[0].tolist()],
+        [addresses[i] for i in data.edge_index[1].tolist()],
+        data.edge_attr[:, 0].tolist(),
+        data.edge_attr[:, 1].tolist(),
+    ))
+    return nodes, edges
+
+def assert_same_graph(seeds):
+    df = pd.DataFrame({"ADDRESS": seeds})
+    expected = load_graph_data_per_address(df, "data.db")
+    actual = load_graph_data_bulk(df, "data.db")
+    assert canonical(*actual) == canonical(*expected)
+    return actual
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The per-address loader always reads ./data.db
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def test_seed_matched_only_on_secondary_column_is_skipped(workdir):
+    # 0xseed only appears in ORIGIN_FROM_ADDRESS; the row's coalesced source is 0xa
+    make_db("data.db", token_rows=[
+        ("0xa", "0xb", "0xseed", "0xe", "1.0", TS.format(1, 1)),
+        ("0xb", "0xc", "0xb", "0xc", "2.0", TS.format(2, 2)),
+    ], transaction_rows=[
+        ("0xc", "0xd", "3.0", TS.format(3, 3)),
+    ])
+    data, node_map = assert_same_graph(["0xseed", "0xc"])
+    assert set(node_map) == {"0xb", "0xc", "0xd"}
+    assert data.edge_index.shape[1] == 2
+
+def test_bulk_matches_per_address_on_random_tables(workdir):
+    rng = random.Random(0)
+    addresses = ["0x" + ("f" * rng.randint(0, 4)) + "%08x" % i for i in range(40)]
+    pick = lambda extra=(): rng.choice(addresses + list(extra))
+    make_db(
+        "data.db",
+        token_rows=[(pick([""]), pick([""]), pick(), pick(), str(rng.random()), TS.format(i % 10, i % 7)) for i in range(150)],
+        transaction_rows=[(pick(), pick([""]), str(rng.random() * 10), TS.format(i % 10, i % 5)) for i in range(150)],
+        dex_rows=[(pick(), pick(), str(rng.random()), TS.format(i % 10, i % 3)) for i in range(60)],
+        nft_rows=[(pick(), pick(), TS.format(i % 10, i % 9)) for i in range(60)],
+    )
+    assert_same_graph(addresses[:15] + ["0xdeadbeef"])
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import math
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from utils.result_cache import TTLResultCache
+from utils.risk_features import (
+    UNKNOWN, WALLET_FLAGS, TOKEN_FLAGS, WALLET_RECORD_DTYPE, TOKEN_RECORD_DTYPE,
+    WalletRiskFeatures, TokenRiskFeatures, goplus_value, parse_flag, parse_float,
+    to_records, features_to_dict, features_from_dict,
+)
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", 1), ("0", 0), (1, 1), (None, UNKNOWN), ("", UNKNOWN), ("yes", UNKNOWN),
+])
+def test_parse_flag(value, expected):
+    assert parse_flag(value) == expected
+
+@pytest.mark.parametrize("value, expected", [("0.05", 0.05), ("1", 1.0), (0.2, 0.2)])
+def test_parse_float(value, expected):
+    assert parse_float(value) == pytest.approx(expected)
+
+@pytest.mark.parametrize("value", [None, "", "n/a"])
+def test_parse_float_unknown_is_nan(value):
+    assert math.isnan(parse_float(value))
+
+def test_goplus_value_plain_underscored_and_sdk_model():
+    assert goplus_value({"is_honeypot": "1"}, "is_honeypot") == "1"
+    assert goplus_value({"_is_honeypot": "1"}, "is_honeypot") == "1"
+    assert goplus_value(SimpleNamespace(_is_honeypot="1"), "is_honeypot") == "1"
+    assert goplus_value({}, "is_honeypot") is None
+    assert goplus_value(SimpleNamespace(), "is_honeypot") is None
+
+def test_wallet_from_goplus_strings_and_missing():
+    result = {"_mixer": "1", "sanctioned": "0", "number_of_malicious_contracts_created": "3",
+              "contract_address": "0", "data_source": "SlowMist"}
+    features = WalletRiskFeatures.from_goplus("0xABC", result)
+    assert features.address == "0xabc"
+    assert features.mixer == 1
+    assert features.sanctioned == 0
+    assert features.cybercrime == UNKNOWN
+    assert features.malicious_contracts_created == 3
+    assert features.is_contract == 0
+    assert features.data_source == "SlowMist"
+    assert features.raised_flags() == ["mixer"]
+
+def test_wallet_from_goplus_empty_result():
+    features = WalletRiskFeatures.from_goplus("0xabc", {})
+    assert all(getattr(features, flag) == UNKNOWN for flag in WALLET_FLAGS)
+    assert features.malicious_contracts_created == 0
+    assert features.data_source == ""
+
+def test_token_from_goplus_strings_and_missing():
+    result = SimpleNamespace(_is_honeypot="0", _is_open_source="1", _buy_tax="0.05", _sell_tax="",
+                             _holder_count="1234", _token_symbol="TKN", _owner_address="0xOWNER")
+    features = TokenRiskFeatures.from_goplus("0xTOKEN", result, chain_id="8453")
+    assert (features.address, features.chain_id, features.token_symbol) == ("0xtoken", "8453", "TKN")
+    assert features.owner_address == "0xowner"
+    assert features.is_honeypot == 0
+    assert features.is_mintable == UNKNOWN
+    assert features.buy_tax == pytest.approx(0.05)
+    assert math.isnan(features.sell_tax)
+    assert math.isnan(features.owner_percent)
+    assert features.holder_count == 1234
+    assert features.lp_holder_count == UNKNOWN
+    assert features.raised_flags() == ["is_open_source"]
+
+def test_features_dict_round_trip_keeps_nan():
+    features = TokenRiskFeatures("0xtoken", is_honeypot=1, buy_tax=0.1)
+    data = json.loads(json.dumps(features_to_dict(features)))
+    assert data["sell_tax"] is None and data["buy_tax"] == pytest.approx(0.1)
+
+    restored = features_from_dict(TokenRiskFeatures, {**data, "unexpected": 1})
+    assert restored.is_honeypot == 1
+    assert restored.buy_tax == pytest.approx(0.1)
+    assert math.isnan(restored.sell_tax)
+    assert features_to_dict(restored) == features_to_dict(features)
+
+def test_features_round_trip_through_persistent_cache(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    features = TokenRiskFeatures("0xtoken", is_honeypot=0)
+
+    async def fetch():
+        return features_to_dict(features)
+
+    writer = TTLResultCache(version="1", fresh_for=60, max_stale=60, db_path=db_path)
+    asyncio.run(writer.get_or_fetch("8453:0xtoken", fetch))
+
+    async def fail():
+        raise AssertionError("should be served from the SQLite tier")
+
+    reader = TTLResultCache(version="1", fresh_for=60, max_stale=60, db_path=db_path)
+    restored = features_from_dict(TokenRiskFeatures, asyncio.run(reader.get_or_fetch("8453:0xtoken", fail)))
+    assert restored.is_honeypot == 0
+    assert math.isnan(restored.buy_tax) and math.isnan(restored.sell_tax)
+    assert features_to_dict(restored) == features_to_dict(features)
+
+def test_to_records_tokens():
+    tokens = [
+        TokenRiskFeatures("0xaa", chain_id="8453", is_honeypot=1, sell_tax=0.5, holder_count=10),
+        TokenRiskFeatures("0xbb"),
+    ]
+    records = to_records(tokens, TOKEN_RECORD_DTYPE)
+    assert records.dtype == TOKEN_RECORD_DTYPE
+    assert records["address"].tolist() == [b"0xaa", b"0xbb"]
+    assert records["chain_id"][0] == b"8453"
+    assert records["is_honeypot"].tolist() == [1, UNKNOWN]
+    assert records["sell_tax"][0] == pytest.approx(0.5)
+    assert np.isnan(records["sell_tax"][1])
+    assert records["holder_count"].tolist() == [10, UNKNOWN]
+    assert set(TOKEN_FLAGS) <= set(TOKEN_RECORD_DTYPE.names)
+
+def test_to_records_wallets_and_empty():
+    wallets = [WalletRiskFeatures("0xaa", mixer=1, malicious_contracts_created=2)]
+    records = to_records(wallets, WALLET_RECORD_DTYPE)
+    assert records["mixer"].tolist() == [1]
+    assert records["sanctioned"].tolist() == [UNKNOWN]
+    assert records["malicious_contracts_created"].tolist() == [2]
+    assert len(to_records([], WALLET_RECORD_DTYPE)) == 0
@@ -0,0 +1,126 @@
+import math
+import random
+import numpy as np
+import pytest
+from utils.risk_features import (
+    UNKNOWN, WALLET_FLAGS, TOKEN_FLAGS, WALLET_RECORD_DTYPE, TOKEN_RECORD_DTYPE,
+    WalletRiskFeatures, TokenRiskFeatures, to_records,
+)
+from wallet_token_agents.risk_scorer import (
+    TAX_HIGH, TAX_CRITICAL, risk_level, combine, assess_wallet, assess_token,
+    score_wallet_records, score_token_records, format_assessment,
+)
+
+def clean_wallet(**flags):
+    return WalletRiskFeatures("0xwallet", **{**{flag: 0 for flag in WALLET_FLAGS}, **flags})
+
+def clean_token(**fields):
+    defaults = {flag: 0 for flag in TOKEN_FLAGS}
+    defaults.update(is_open_source=1, buy_tax=0.0, sell_tax=0.0)
+    return TokenRiskFeatures("0xtoken", **{**defaults, **fields})
+
+@pytest.mark.parametrize("score, level", [
+    (0.0, "low"), (0.2499, "low"), (0.25, "medium"), (0.5999, "medium"),
+    (0.6, "high"), (0.8999, "high"), (0.9, "critical"), (1.0, "critical"),
+])
+def test_risk_level_thresholds(score, level):
+    assert risk_level(score) == level
+
+def test_combine_is_noisy_or():
+    assessment = combine([0.5, 0.5], ["a", "b"], 0.0)
+    assert assessment.score == pytest.approx(0.75)
+    assert assessment.level == "high"
+    assert not assessment.ambiguous
+
+def test_combine_ambiguity():
+    assert combine([0.3], ["a"], 0.0).ambiguous                # medium
+    assert not combine([], [], 0.5).ambiguous                  # clean, half reported
+    assert combine([], [], 0.51).ambiguous                     # clean, mostly unreported
+    assert not combine([0.95], ["a"], 1.0).ambiguous           # critical regardless of gaps
+
+def test_clean_wallet_is_low_and_clear():
+    assessment = assess_wallet(clean_wallet())
+    assert (assessment.level, assessment.score, assessment.reasons, assessment.ambiguous) == ("low", 0, [], False)
+
+def test_wallet_without_data_is_ambiguous():
+    assessment = assess_wallet(WalletRiskFeatures("0xwallet"))
+    assert assessment.level == "low"
+    assert assessment.ambiguous
+
+@pytest.mark.parametrize("flag, level", [
+    ("sanctioned", "critical"), ("phishing_activities", "critical"), ("mixer", "high"),
+    ("fake_kyc", "medium"), ("gas_abuse", "low"),
+])
+def test_wallet_single_flag_levels(flag, level):
+    assessment = assess_wallet(clean_wallet(**{flag: 1}))
+    assert assessment.level == level
+    assert assessment.reasons == [flag]
+
+def test_wallet_malicious_contracts():
+    assessment = assess_wallet(clean_wallet(malicious_contracts_created=2))
+    assert assessment.level == "high"
+    assert assessment.reasons == ["created 2 malicious contracts"]
+
+@pytest.mark.parametrize("fields, level", [
+    ({}, "low"),
+    ({"is_honeypot": 1}, "critical"),
+    ({"sell_tax": TAX_CRITICAL}, "critical"),
+    ({"sell_tax": TAX_HIGH}, "medium"),
+    ({"buy_tax": TAX_HIGH - 0.001}, "low"),
+    ({"is_open_source": 0}, "medium"),
+    ({"is_mintable": 1}, "medium"),
+    ({"hidden_owner": 1, "is_mintable": 1}, "high"),
+])
+def test_token_levels(fields, level):
+    assert assess_token(clean_token(**fields)).level == level
+
+def test_token_unknown_taxes_are_not_flagged():
+    assessment = assess_token(clean_token(buy_tax=math.nan, sell_tax=math.nan))
+    assert assessment.level == "low"
+    assert assessment.reasons == []
+
+def test_trust_list_overrides_non_critical_risk():
+    assessment = assess_token(clean_token(trust_list=1, is_mintable=1, is_proxy=1))
+    assert assessment.level == "low"
+    assert not assessment.ambiguous
+    assert assessment.reasons == ["is_proxy", "is_mintable"]
+
+def test_trust_list_does_not_hide_critical_risk():
+    assessment = assess_token(clean_token(trust_list=1, is_honeypot=1))
+    assert assessment.level == "critical"
+
+def test_to_dict_and_format():
+    assessment = assess_token(clean_token(sell_tax=0.6))
+    assert assessment.to_dict() == {"risk_level": "critical", "risk_score": 0.95,
+                                    "reasons": ["sell_tax 60%"], "ambiguous": False}
+    assert format_assessment(assessment) == "Rule-based pre-assessment: critical (score 0.95); sell_tax 60%"
+
+def random_token(rng):
+    def tax():
+        return rng.choice([math.nan, 0.0, rng.random() * 0.3, rng.random()])
+    return TokenRiskFeatures(
+        f"0x{rng.getrandbits(160):040x}",
+        **{flag: rng.choice([UNKNOWN, 0, 0, 0, 1]) for flag in TOKEN_FLAGS},
+        buy_tax=tax(), sell_tax=tax()
+    )
+
+def random_wallet(rng):
+    return WalletRiskFeatures(
+        f"0x{rng.getrandbits(160):040x}",
+        **{flag: rng.choice([UNKNOWN, 0, 0, 0, 0, 1]) for flag in WALLET_FLAGS},
+        malicious_contracts_created=rng.choice([0, 0, 0, 3])
+    )
+
+def test_score_token_records_matches_assess_token():
+    rng = random.Random(0)
+    tokens = [random_token(rng) for _ in range(500)]
+    scores = score_token_records(to_records(tokens, TOKEN_RECORD_DTYPE))
+    expected = np.array([assess_token(token).score for token in tokens])
+    np.testing.assert_allclose(scores, expected, atol=1e-9)
+
+def test_score_wallet_records_matches_assess_wallet():
+    rng = random.Random(0)
+    wallets = [random_wallet(rng) for _ in range(500)]
+    scores = score_wallet_records(to_records(wallets, WALLET_RECORD_DTYPE))
+    expected = np.array([assess_wallet(wallet).score for wallet in wallets])
+    np.testing.assert_allclose(scores, expected, atol=1e-9)
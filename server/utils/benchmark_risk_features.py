@@ -0,0 +1,50 @@
+import time
+import numpy as np
+from utils.risk_features import TOKEN_FLAGS, TOKEN_RECORD_DTYPE, TokenRiskFeatures, to_records
+
+# Benchmark configuration
+NUM_RECORDS = 1_000_000
+PACK_SAMPLE = 100_000  # Features packed with to_records (the rest are generated as records directly)
+REPEATS = 5
+
+def make_records(n, seed=0):
+    """Synthetic TOKEN_RECORD_DTYPE records with ~1% honeypots and random taxes"""
+    rng = np.random.default_rng(seed)
+    records = np.zeros(n, dtype=TOKEN_RECORD_DTYPE)
+    records["address"] = np.char.add(b"0x", np.char.zfill(np.arange(n).astype("S40"), 40))
+    for flag in TOKEN_FLAGS:
+        records[flag] = rng.random(n) < 0.01
+    records["sell_tax"] = rng.random(n) * 0.3
+    records["buy_tax"] = rng.random(n) * 0.3
+    return records
+
+def make_features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        TokenRiskFeatures(f"0x{i:040x}", is_honeypot=int(rng.random() < 0.01), sell_tax=float(rng.random() * 0.3))
+        for i in range(n)
+    ]
+
+def timed(func, repeats=REPEATS):
+    """Best-of-`repeats` wall time of func() in milliseconds, and its last result"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+def main():
+    features = make_features(PACK_SAMPLE)
+    elapsed, _ = timed(lambda: to_records(features, TOKEN_RECORD_DTYPE), repeats=1)
+    print(f"to_records ({PACK_SAMPLE} features): {elapsed:8.1f} ms")
+
+    records = make_records(NUM_RECORDS)
+    elapsed, mask = timed(lambda: (records["is_honeypot"] == 1) | (records["sell_tax"] >= 0.25))
+    print(f"mask honeypot | sell_tax >= 25% ({NUM_RECORDS} records): {elapsed:8.1f} ms, {int(mask.sum())} matches")
+    elapsed, _ = timed(lambda: records[mask])
+    print(f"select matching records: {elapsed:8.1f} ms")
+
+# python -m utils.benchmark_risk_features (from server/)
+if __name__ == "__main__":
+    main()
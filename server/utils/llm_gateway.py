@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import os
+import httpx
+from groq import AsyncGroq
+
+try:
+    import h2  # noqa: F401  Optional: enables HTTP/2 to the LLM API
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))   # Default in-flight calls per model
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+
+# Per-model overrides of LLM_MAX_CONCURRENCY, sized to each model's rate limit
+MODEL_CONCURRENCY = {
+    "deepseek-r1-distill-llama-70b": LLM_MAX_CONCURRENCY,
+}
+
+
+class LLMGateway:
+    """
+    Single entry point for every agent's chat completions.
+
+    One long-lived AsyncGroq client is kept on a keep-alive httpx pool (HTTP/2
+    when h2 is installed). Calls are limited per model by a semaphore, and
+    concurrent calls with identical parameters are coalesced: duplicates await
+    the call already in flight instead of sending their own.
+    """
+
+    def __init__(self, max_connections=LLM_MAX_CONNECTIONS, timeout=LLM_TIMEOUT):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.calls = 0
+        self.coalesced = 0
+        self._client = None
+        self._loop = None
+        self._semaphores = {}
+        self._in_flight = {}
+
+    async def _get_client(self) -> AsyncGroq:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            stale_client, stale_loop = self._client, self._loop
+            # Created lazily: main.py loads GROQ_API_KEY from .env at startup, after imports
+            self._client = AsyncGroq(
+                timeout=self.timeout,
+                http_client=httpx.AsyncClient(
+                    http2=HTTP2,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=60
+                    )
+                )
+            )
+            self._loop = loop
+            self._semaphores = {}
+            self._in_flight = {}
+            # Swapped in before awaiting, so concurrent callers share the new client
+            if stale_client is not None:
+                await self._close_stale_client(stale_client, stale_loop)
+        return self._client
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(MODEL_CONCURRENCY.get(model, LLM_MAX_CONCURRENCY))
+        return self._semaphores[model]
+
+    @staticmethod
+    async def _close_stale_client(client, loop):
+        """Close a client left on another event loop, so its connection pool is not leaked"""
+        try:
+            if loop is not None and loop.is_running():
+                # The pool's connections belong to that loop; close it there
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.close(), loop))
+            else:
+                await client.close()
+        except Exception as e:
+            print(f"Error while closing stale LLM client: {e}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+
+    async def _create(self, client, params):
+        async with self._semaphore(params["model"]):
+            self.calls += 1
+            response = await client.chat.completions.create(**params)
+        return response.choices[0].message.content
+
+    async def complete(self, model: str, messages: list, **kwargs) -> str:
+        """Run one chat completion and return the message content"""
+        client = await self._get_client()
+        params = {"model": model, "messages": messages, **kwargs}
+        key = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._create(client, params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller cancelling does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def stream(self, model: str, messages: list, **kwargs):
+        """Stream one chat completion, yielding content deltas as they arrive (never coalesced)"""
+        client = await self._get_client()
+        async with self._semaphore(model):
+            self.calls += 1
+            response = await client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+            try:
+                async for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Releases the connection when the consumer stops early (e.g. client disconnect)
+                await response.close()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "http2": HTTP2,
+        }
+
+
+_gateway = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway, so every agent shares one connection pool and set of limits."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
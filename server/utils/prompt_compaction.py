@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+
+try:
+    import tiktoken  # Optional: exact BPE counts instead of the character estimate
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+CHARS_PER_TOKEN = 4    # Estimate used when tiktoken is not installed
+FORENSIC_TOKEN_BUDGET = int(os.getenv("FORENSIC_TOKEN_BUDGET", "12000"))   # Transaction data in fraud_analyzer
+CONTRACT_TOKEN_BUDGET = int(os.getenv("CONTRACT_TOKEN_BUDGET", "6000"))    # Contract code in summariser_agent
+CALLDATA_KEEP = 10     # Calldata up to this many characters (a bare method selector) is kept verbatim
+CONTEXT_LINES = 8      # Lines kept either side of a flagged line when a contract is truncated
+NATIVE_DECIMALS = 18
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+class PromptMetrics:
+    """Per-prompt totals of tokens before and after compaction"""
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, original: int, compacted: int):
+        with self._lock:
+            totals = self._totals.setdefault(name, {"prompts": 0, "original_tokens": 0, "compacted_tokens": 0})
+            totals["prompts"] += 1
+            totals["original_tokens"] += original
+            totals["compacted_tokens"] += compacted
+        saved = 1 - compacted / original if original else 0.0
+        print(f"Compacted {name}: {original} -> {compacted} tokens ({saved:.0%} smaller)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {**totals, "shrink": 1 - totals["compacted_tokens"] / totals["original_tokens"]
+                       if totals["original_tokens"] else 0.0}
+                for name, totals in self._totals.items()
+            }
+
+prompt_metrics = PromptMetrics()
+
+def compact_calldata(calldata):
+    """Replace bulky calldata with its selector, size and a short hash (identical payloads stay recognisable)"""
+    if not calldata or len(calldata) <= CALLDATA_KEEP:
+        return calldata
+    digest = hashlib.sha256(calldata.encode("utf-8")).hexdigest()[:12]
+    return f"{calldata[:CALLDATA_KEEP]}…({(len(calldata) - 2) // 2} bytes, sha256:{digest})"
+
+def compact_transaction(tx: dict) -> dict:
+    compact = {key: value for key, value in tx.items() if value not in (None, "") and key != "timeStamp"}
+    if "input_data" in compact:
+        compact["input_data"] = compact_calldata(compact["input_data"])
+    return compact
+
+def transfer_amount(tx: dict) -> float:
+    """Transfer value in whole units of its asset (NFTs count as 1)"""
+    if tx.get("tx_type") == "nft":
+        return 1.0
+    try:
+        decimals = int(tx.get("token_decimal") or NATIVE_DECIMALS)
+        return int(tx.get("value") or 0) / 10 ** decimals
+    except (TypeError, ValueError):
+        return 0.0
+
+def aggregate_by_counterparty(wallet: str, transactions) -> list:
+    """
+    Collapse a wallet's transfers into one row per (counterparty, direction, asset)
+    with count, total amount and first/last time, largest flows first.
+    """
+    wallet = (wallet or "").lower()
+    groups = {}
+    for tx in transactions:
+        sender = (tx.get("from") or "").lower()
+        receiver = (tx.get("to") or "").lower()
+        if sender == wallet:
+            direction, counterparty = "out", receiver
+        elif receiver == wallet:
+            direction, counterparty = "in", sender
+        else:
+            direction, counterparty = f"{sender}->", receiver
+        asset = tx.get("token_symbol") or ("ETH" if tx.get("tx_type") == "normal" else tx.get("tx_type"))
+        group = groups.setdefault((counterparty, direction, asset), {
+            "counterparty": counterparty, "direction": direction, "asset": asset,
+            "transfers": 0, "total": 0.0, "first": None, "last": None
+        })
+        group["transfers"] += 1
+        group["total"] += transfer_amount(tx)
+        when = tx.get("readable_time")
+        if when and when != "N/A":
+            group["first"] = min(group["first"] or when, when)
+            group["last"] = max(group["last"] or when, when)
+    return sorted(groups.values(), key=lambda group: (group["transfers"], group["total"]), reverse=True)
+
+def format_counterparties(groups) -> str:
+    return "\n".join(
+        f"{group['direction']:>4} {group['counterparty']} | {group['asset']} | {group['transfers']} transfers | "
+        f"total {group['total']:.6g} | {group['first'] or 'N/A'} .. {group['last'] or 'N/A'}"
+        for group in groups
+    )
+
+def transaction_relevance(tx: dict, focus: set) -> tuple:
+    """Transfers touching the victim, the token or another suspect first, then by size"""
+    touched = {(tx.get(key) or "").lower() for key in ("from", "to", "contract_address")}
+    return (len(touched & focus), transfer_amount(tx))
+
+def fit_to_budget(sections, budget: int):
+    """Keep whole (text) sections in order until the token budget is spent"""
+    kept = []
+    used = 0
+    for text in sections:
+        tokens = count_tokens(text)
+        if used + tokens > budget:
+            break
+        kept.append(text)
+        used += tokens
+    return kept
+
+def compact_wallet_data(results: dict, victim: str = "", token_address: str = "",
+                        budget: int = FORENSIC_TOKEN_BUDGET) -> str:
+    """
+    Render {suspect wallet: transactions} for the forensic prompt within `budget`
+    tokens: a counterparty summary per wallet, then individual transfers (calldata
+    hashed) in order of relevance to the victim, the token and the other suspects.
+    """
+    focus = {address.lower() for address in [victim, token_address, *results] if address}
+    per_wallet = budget // max(len(results), 1)
+
+    blocks = []
+    for wallet, transactions in results.items():
+        if not isinstance(transactions, list):
+            blocks.append(f"## Wallet {wallet}\n{transactions}")
+            continue
+        summary = format_counterparties(aggregate_by_counterparty(wallet, transactions))
+        header = f"## Wallet {wallet} ({len(transactions)} transfers)\n### Counterparties\n{summary}\n### Transfers"
+        ranked = sorted(transactions, key=lambda tx: transaction_relevance(tx, focus), reverse=True)
+        lines = fit_to_budget(
+            [str(compact_transaction(tx)) for tx in ranked],
+            max(per_wallet - count_tokens(header), 0)
+        )
+        omitted = len(transactions) - len(lines)
+        if omitted:
+            lines.append(f"... {omitted} less relevant transfers omitted")
+        blocks.append("\n".join([header, *lines]))
+
+    compacted = "\n\n".join(blocks)
+    prompt_metrics.record("fraud_analyzer.transactions", count_tokens(repr(results)), count_tokens(compacted))
+    return compacted
+
+def number_line(number: int, line: str) -> str:
+    return f"{number}. {line}"
+
+def compact_contract(code: str, vulnerabilities=None, budget: int = CONTRACT_TOKEN_BUDGET,
+                     context: int = CONTEXT_LINES) -> str:
+    """
+    Number every line with its original line number (the numbering the master
+    agent reports vulnerabilities in) and return the whole contract when it fits
+    `budget` tokens. Otherwise keep the lines around each flagged vulnerability,
+    then the head of the contract, eliding the rest with line-range markers;
+    kept lines keep their original numbers.
+    """
+    lines = code.strip().splitlines()
+    numbered = [number_line(number, line) for number, line in enumerate(lines, 1)]
+    original = count_tokens("\n".join(numbered))
+    if original <= budget:
+        prompt_metrics.record("summariser_agent.contract", original, original)
+        return "\n".join(numbered)
+    line_tokens = [count_tokens(line) + 1 for line in numbered]
+
+    flagged = []
+    for entry in vulnerabilities or []:
+        try:
+            flagged.append(int(entry[0]))
+        except (TypeError, ValueError, IndexError):
+            continue
+
+    # Most relevant lines first: flagged lines outward, then the contract head
+    order = []
+    for distance in range(context + 1):
+        for line in flagged:
+            order.extend(n for n in (line - distance, line + distance) if 1 <= n <= len(lines))
+    order.extend(range(1, len(lines) + 1))
+
+    keep = set()
+    used = 0
+    for number in order:
+        if number in keep:
+            continue
+        tokens = line_tokens[number - 1]
+        if used + tokens > budget:
+            break
+        keep.add(number)
+        used += tokens
+
+    output = []
+    skipped_from = None
+    for number, line in enumerate(numbered, 1):
+        if number in keep:
+            if skipped_from is not None:
+                output.append(f"// ... lines {skipped_from}-{number - 1} omitted ...")
+                skipped_from = None
+            output.append(line)
+        elif skipped_from is None:
+            skipped_from = number
+    if skipped_from is not None:
+        output.append(f"// ... lines {skipped_from}-{len(lines)} omitted ...")
+
+    compacted = "\n".join(output)
+    prompt_metrics.record("summariser_agent.contract", original, count_tokens(compacted))
+    return compacted
@@ -0,0 +1,220 @@
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# String literals are matched first so comment markers inside them are left alone
+SOLIDITY_TOKENS = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|//[^\n]*|/\*.*?\*/', re.S)
+WHITESPACE = re.compile(r"\s+")
+
+def normalize_contract(code: str) -> str:
+    """Strip comments and collapse whitespace, so template clones hash the same"""
+    def replace(match):
+        token = match.group(0)
+        return " " if token.startswith("/") else token
+    return WHITESPACE.sub(" ", SOLIDITY_TOKENS.sub(replace, code)).strip()
+
+def contract_hash(code: str) -> str:
+    return hashlib.sha256(normalize_contract(code).encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    Content-addressed result cache: an in-memory LRU in front of an optional
+    SQLite table. Every entry records the model and prompt version it was
+    produced with; entries from other versions count as misses.
+
+    Async callers use aget/aget_entry/aset, which only touch memory on the event
+    loop and run SQLite reads and writes in a worker thread; get/set do the same
+    work inline for synchronous callers.
+    """
+    def __init__(self, model_version: str, prompt_version: str, max_entries: int = 1024, db_path: str = None,
+                 table: str = "analysis_cache"):
+        self.model_version = model_version
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()     # Guards the in-memory LRU (never held during I/O)
+        self._db_lock = threading.Lock()  # Serialises use of the shared SQLite connection
+        self._conn = None
+
+    def _current(self, model_version, prompt_version):
+        return model_version == self.model_version and prompt_version == self.prompt_version
+
+    def _db(self):
+        """Shared SQLite connection, opened on first use (call with _db_lock held)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT, model_version TEXT, prompt_version TEXT, created REAL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _memory_entry(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._current(entry["model_version"], entry["prompt_version"]):
+                self._memory.move_to_end(key)
+                return entry["value"], entry["created"]
+        return None
+
+    def _load(self, key):
+        """(value, created) of a current entry in the SQLite tier, or None; remembered in memory"""
+        with self._db_lock:
+            row = self._db().execute(
+                f"SELECT value, model_version, prompt_version, created FROM {self.table} WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None or not self._current(row[1], row[2]):
+            return None
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, value, row[3])
+        return value, row[3]
+
+    def _store(self, key, value, created):
+        with self._db_lock:
+            conn = self._db()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, model_version, prompt_version, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value), self.model_version, self.prompt_version, created)
+            )
+            conn.commit()
+
+    def _count(self, entry):
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def get(self, key: str):
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: str):
+        """(value, created timestamp) of a current entry, or None"""
+        entry = self._memory_entry(key)
+        if entry is None and self.db_path:
+            entry = self._load(key)
+        return self._count(entry)
+
+    async def aget(self, key: str):
+        entry = await self.aget_entry(key)
+        return None if entry is None else entry[0]
+
+    async def aget_entry(self, key: str):
+        """get_entry with the SQLite lookup run off the event loop"""
+        entry = self._memory_entry(key)
+        if entry is None and self.db_path:
+            entry = await asyncio.to_thread(self._load, key)
+        return self._count(entry)
+
+    def set(self, key: str, value):
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+        if self.db_path:
+            self._store(key, value, created)
+
+    async def aset(self, key: str, value):
+        """set with the SQLite write run off the event loop"""
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+        if self.db_path:
+            await asyncio.to_thread(self._store, key, value, created)
+
+    def _remember(self, key, value, created):
+        self._memory[key] = {
+            "value": value,
+            "model_version": self.model_version,
+            "prompt_version": self.prompt_version,
+            "created": created,
+        }
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "model_version": self.model_version,
+            "prompt_version": self.prompt_version,
+            "persistent": self.db_path is not None,
+        }
+
+class TTLResultCache(ResultCache):
+    """
+    ResultCache with freshness windows and stale-while-revalidate.
+
+    Entries younger than fresh_for seconds are served directly. Entries up to
+    max_stale seconds old are served immediately while one background task per
+    key refetches them. Older or missing entries are fetched inline, with
+    concurrent misses for the same key sharing one fetch.
+    """
+    def __init__(self, version: str, fresh_for: float, max_stale: float, max_entries: int = 1024,
+                 db_path: str = None, table: str = "lookup_cache"):
+        super().__init__(model_version=version, prompt_version=version, max_entries=max_entries,
+                         db_path=db_path, table=table)
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.stale_hits = 0
+        self._fetches = {}
+
+    async def get_or_fetch(self, key: str, fetch, cacheable=lambda value: True):
+        """
+        Return the cached value for key, calling `fetch()` (a coroutine function)
+        when it is missing or too old. Results failing `cacheable` are returned
+        but not stored.
+        """
+        entry = await self.aget_entry(key)
+        if entry is not None:
+            value, created = entry
+            age = time.time() - created
+            if age < self.fresh_for:
+                return value
+            if age < self.max_stale:
+                self.stale_hits += 1
+                self._fetch(key, fetch, cacheable)  # Revalidate in the background
+                return value
+        return await asyncio.shield(self._fetch(key, fetch, cacheable))
+
+    def _fetch(self, key, fetch, cacheable):
+        task = self._fetches.get(key)
+        if task is None:
+            async def run():
+                value = await fetch()
+                if cacheable(value):
+                    await self.aset(key, value)
+                return value
+            task = asyncio.ensure_future(run())
+            self._fetches[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def _finish(self, key, task):
+        self._fetches.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error while refreshing cache entry {key}: {task.exception()}")
+
+    def stats(self):
+        return {
+            **super().stats(),
+            "stale_hits": self.stale_hits,
+            "refreshing": len(self._fetches),
+            "fresh_for": self.fresh_for,
+            "max_stale": self.max_stale,
+        }
@@ -0,0 +1,209 @@
+import math
+import numpy as np
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, Iterable
+
+UNKNOWN = -1  # Flag value when GoPlus did not report a field
+
+# GoPlus address_security flags ("0"/"1")
+WALLET_FLAGS = (
+    "cybercrime", "money_laundering", "financial_crime", "darkweb_transactions", "phishing_activities",
+    "stealing_attack", "blackmail_activities", "sanctioned", "malicious_mining_activities", "mixer",
+    "fake_kyc", "fake_token", "fake_standard_interface", "blacklist_doubt", "honeypot_related_address",
+    "gas_abuse", "reinit",
+)
+
+# GoPlus token_security flags ("0"/"1")
+TOKEN_FLAGS = (
+    "is_honeypot", "honeypot_with_same_creator", "cannot_buy", "cannot_sell_all", "hidden_owner",
+    "can_take_back_ownership", "owner_change_balance", "selfdestruct", "external_call", "is_proxy",
+    "is_mintable", "transfer_pausable", "trading_cooldown", "is_blacklisted", "is_whitelisted",
+    "is_anti_whale", "anti_whale_modifiable", "slippage_modifiable", "personal_slippage_modifiable",
+    "is_open_source", "is_in_dex", "is_true_token", "is_airdrop_scam", "fake_token", "trust_list",
+)
+TOKEN_FRACTIONS = ("buy_tax", "sell_tax", "owner_percent", "creator_percent")  # 0..1, NaN when unknown
+TOKEN_COUNTS = ("holder_count", "lp_holder_count")
+
+def goplus_value(data, name):
+    """Field of a serialized GoPlus result (keys may carry the SDK's leading underscore) or SDK model"""
+    if isinstance(data, dict):
+        return data.get(name, data.get(f"_{name}"))
+    return getattr(data, f"_{name}", None)
+
+def parse_flag(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return UNKNOWN
+
+def parse_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+@dataclass(slots=True)
+class WalletRiskFeatures:
+    """GoPlus address_security flags for one wallet; every flag is 0, 1 or UNKNOWN"""
+    address: str
+    cybercrime: int = UNKNOWN
+    money_laundering: int = UNKNOWN
+    financial_crime: int = UNKNOWN
+    darkweb_transactions: int = UNKNOWN
+    phishing_activities: int = UNKNOWN
+    stealing_attack: int = UNKNOWN
+    blackmail_activities: int = UNKNOWN
+    sanctioned: int = UNKNOWN
+    malicious_mining_activities: int = UNKNOWN
+    mixer: int = UNKNOWN
+    fake_kyc: int = UNKNOWN
+    fake_token: int = UNKNOWN
+    fake_standard_interface: int = UNKNOWN
+    blacklist_doubt: int = UNKNOWN
+    honeypot_related_address: int = UNKNOWN
+    gas_abuse: int = UNKNOWN
+    reinit: int = UNKNOWN
+    malicious_contracts_created: int = 0
+    is_contract: int = UNKNOWN
+    data_source: str = ""
+
+    @classmethod
+    def from_goplus(cls, address: str, result) -> "WalletRiskFeatures":
+        """Build from an address_security result (SDK model or serialized dict)"""
+        data_source = goplus_value(result, "data_source") or ""
+        contract_address = goplus_value(result, "contract_address")
+        return cls(
+            address=address.lower(),
+            **{flag: parse_flag(goplus_value(result, flag)) for flag in WALLET_FLAGS},
+            malicious_contracts_created=max(parse_flag(goplus_value(result, "number_of_malicious_contracts_created")), 0),
+            is_contract=parse_flag(contract_address),
+            data_source=str(data_source)
+        )
+
+    def raised_flags(self):
+        return [flag for flag in WALLET_FLAGS if getattr(self, flag) == 1]
+
+@dataclass(slots=True)
+class TokenRiskFeatures:
+    """GoPlus token_security fields for one token; flags are 0, 1 or UNKNOWN, fractions NaN when unknown"""
+    address: str
+    chain_id: str = ""
+    token_name: str = ""
+    token_symbol: str = ""
+    owner_address: str = ""
+    creator_address: str = ""
+    is_honeypot: int = UNKNOWN
+    honeypot_with_same_creator: int = UNKNOWN
+    cannot_buy: int = UNKNOWN
+    cannot_sell_all: int = UNKNOWN
+    hidden_owner: int = UNKNOWN
+    can_take_back_ownership: int = UNKNOWN
+    owner_change_balance: int = UNKNOWN
+    selfdestruct: int = UNKNOWN
+    external_call: int = UNKNOWN
+    is_proxy: int = UNKNOWN
+    is_mintable: int = UNKNOWN
+    transfer_pausable: int = UNKNOWN
+    trading_cooldown: int = UNKNOWN
+    is_blacklisted: int = UNKNOWN
+    is_whitelisted: int = UNKNOWN
+    is_anti_whale: int = UNKNOWN
+    anti_whale_modifiable: int = UNKNOWN
+    slippage_modifiable: int = UNKNOWN
+    personal_slippage_modifiable: int = UNKNOWN
+    is_open_source: int = UNKNOWN
+    is_in_dex: int = UNKNOWN
+    is_true_token: int = UNKNOWN
+    is_airdrop_scam: int = UNKNOWN
+    fake_token: int = UNKNOWN
+    trust_list: int = UNKNOWN
+    buy_tax: float = math.nan
+    sell_tax: float = math.nan
+    owner_percent: float = math.nan
+    creator_percent: float = math.nan
+    holder_count: int = UNKNOWN
+    lp_holder_count: int = UNKNOWN
+
+    @classmethod
+    def from_goplus(cls, address: str, result, chain_id: str = "") -> "TokenRiskFeatures":
+        """Build from one token's token_security result (SDK model or serialized dict)"""
+        def text(name):
+            value = goplus_value(result, name)
+            return "" if value is None else str(value)
+
+        return cls(
+            address=address.lower(),
+            chain_id=chain_id,
+            token_name=text("token_name"),
+            token_symbol=text("token_symbol"),
+            owner_address=text("owner_address").lower(),
+            creator_address=text("creator_address").lower(),
+            **{flag: parse_flag(goplus_value(result, flag)) for flag in TOKEN_FLAGS},
+            **{name: parse_float(goplus_value(result, name)) for name in TOKEN_FRACTIONS},
+            **{name: parse_flag(goplus_value(result, name)) for name in TOKEN_COUNTS}
+        )
+
+    def raised_flags(self):
+        return [flag for flag in TOKEN_FLAGS if getattr(self, flag) == 1]
+
+# Fixed-width record layouts, for scoring or filtering many cached results with NumPy
+WALLET_RECORD_DTYPE = np.dtype(
+    [("address", "S42")]
+    + [(flag, "i1") for flag in WALLET_FLAGS]
+    + [("malicious_contracts_created", "i4"), ("is_contract", "i1")]
+)
+TOKEN_RECORD_DTYPE = np.dtype(
+    [("address", "S42"), ("chain_id", "S16"), ("owner_address", "S42"), ("creator_address", "S42")]
+    + [(flag, "i1") for flag in TOKEN_FLAGS]
+    + [(name, "f4") for name in TOKEN_FRACTIONS]
+    + [(name, "i8") for name in TOKEN_COUNTS]
+)
+
+def to_records(features: Iterable, dtype: np.dtype) -> np.ndarray:
+    """Pack WalletRiskFeatures or TokenRiskFeatures into a structured array of `dtype`"""
+    names = dtype.names
+    rows = [
+        tuple(
+            value.encode("ascii", "replace") if isinstance(value, str) else value
+            for value in (getattr(item, name) for name in names)
+        )
+        for item in features
+    ]
+    return np.array(rows, dtype=dtype)
+
+def features_to_dict(features) -> Dict[str, Any]:
+    """JSON-safe dict (NaN becomes None), for caching and API responses"""
+    return {key: None if isinstance(value, float) and math.isnan(value) else value
+            for key, value in asdict(features).items()}
+
+def features_from_dict(cls, data: Dict[str, Any]):
+    known = {field.name for field in fields(cls)}
+    return cls(**{key: math.nan if value is None else value for key, value in data.items() if key in known})
+
+def format_flag(value: int) -> str:
+    return {1: "yes", 0: "no"}.get(value, "unknown")
+
+def format_wallet_features(features: WalletRiskFeatures) -> str:
+    """Prompt serialization of a wallet's risk flags"""
+    lines = [f"Security Report for {features.address}", f"Data source: {features.data_source or 'N/A'}"]
+    lines += [f"{flag}: {format_flag(getattr(features, flag))}" for flag in WALLET_FLAGS]
+    lines.append(f"malicious_contracts_created: {features.malicious_contracts_created}")
+    lines.append(f"is_contract: {format_flag(features.is_contract)}")
+    return "\n".join(lines)
+
+def format_token_features(features: TokenRiskFeatures) -> str:
+    """Prompt serialization of a token's security fields"""
+    lines = [
+        f"Token Security Report for {features.address} (chain {features.chain_id or 'N/A'})",
+        f"Name: {features.token_name or 'N/A'} ({features.token_symbol or 'N/A'})",
+        f"Owner: {features.owner_address or 'N/A'}",
+        f"Creator: {features.creator_address or 'N/A'}",
+    ]
+    lines += [f"{flag}: {format_flag(getattr(features, flag))}" for flag in TOKEN_FLAGS]
+    lines += [
+        f"{name}: {'unknown' if math.isnan(getattr(features, name)) else f'{getattr(features, name):.4f}'}"
+        for name in TOKEN_FRACTIONS
+    ]
+    lines += [f"{name}: {'unknown' if getattr(features, name) == UNKNOWN else getattr(features, name)}"
+              for name in TOKEN_COUNTS]
+    return "\n".join(lines)
@@ -0,0 +1,33 @@
+import json
+from fastapi.responses import StreamingResponse
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event; data is JSON-encoded"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def relay_tokens(tokens, collected: list = None):
+    """Turn an LLM token stream into "token" events, optionally collecting the text"""
+    async for text in tokens:
+        if collected is not None:
+            collected.append(text)
+        yield sse_event("token", {"text": text})
+
+def sse_response(events):
+    """
+    Wrap an async iterator of sse_event strings in a text/event-stream response.
+    Exceptions are reported as a final "error" event, since the status code has
+    already been sent.
+    """
+    async def guarded():
+        try:
+            async for event in events:
+                yield event
+        except Exception as e:
+            print(f"Error while streaming response: {e}")
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(
+        guarded(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # Stop proxies buffering the stream
+    )
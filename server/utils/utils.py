@@ -1,27 +1,59 @@
+import asyncio
 from scraping.scrape_transactions import get_wallet_transactions
 
-async def fetch_all_wallet_data(search_queries):
+MAX_CONCURRENT_LOOKUPS = 8   # Wallet lookups in flight at once
+LOOKUP_TIMEOUT = 30          # Seconds allowed per wallet lookup
+
+async def iter_wallet_data(search_queries, max_concurrency=MAX_CONCURRENT_LOOKUPS, timeout=LOOKUP_TIMEOUT):
     """
-    Runs get_wallet_transactions sequentially (synchronously) for each wallet in search_queries.
+    Runs get_wallet_transactions concurrently (at most max_concurrency at a time)
+    for each wallet in search_queries and yields results as each wallet completes.
 
     Args:
         search_queries (list[list[str, str, int]]): List of [wallet_address, token_address, top_n]
 
-    Returns:
-        dict: { wallet_address: transaction_list }
+    Yields:
+        tuple: (wallet_address, transaction_list or {"error": ...})
     """
-    results = {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def lookup(wallet_address, token_address, top_n):
+        async with semaphore:
+            try:
+                data = await asyncio.wait_for(
+                    get_wallet_transactions(wallet_address, token_address or None, int(top_n)),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                data = {"error": f"Timed out after {timeout}s"}
+            except Exception as e:
+                data = {"error": str(e)}
+        return wallet_address, data
 
-    for query in search_queries:
-        if len(query) != 3:
-            continue  # ignore malformed entries
+    tasks = [
+        asyncio.create_task(lookup(*query))
+        for query in search_queries
+        if len(query) == 3  # ignore malformed entries
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding lookups if the consumer stops early
+        for task in tasks:
+            task.cancel()
 
-        wallet_address, token_address, top_n = query
+async def fetch_all_wallet_data(search_queries):
+    """
+    Runs get_wallet_transactions concurrently for each wallet in search_queries.
 
-        try:
-            data = await get_wallet_transactions(wallet_address, token_address or None, int(top_n))
-            results[wallet_address] = data
-        except Exception as e:
-            results[wallet_address] = {"error": str(e)}
+    Args:
+        search_queries (list[list[str, str, int]]): List of [wallet_address, token_address, top_n]
 
+    Returns:
+        dict: { wallet_address: transaction_list }, in completion order
+    """
+    results = {}
+    async for wallet_address, data in iter_wallet_data(search_queries):
+        results[wallet_address] = data
     return results
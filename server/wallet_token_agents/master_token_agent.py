@@ -1,9 +1,8 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
 import asyncio
 
-async def token_analyst_agent(token_report: str):
-    client = AsyncGroq()
-    
+def build_token_analyst_agent_request(token_report: str):
+    """Chat completion parameters for token_analyst_agent"""
     user_prompt = f"""
 You are an advanced blockchain token security analyst. Analyze this token security report (provided as raw text) and provide a comprehensive assessment.
 
@@ -91,7 +90,7 @@ You are an advanced blockchain token security analyst. Analyze this token securi
 - [Preventive measures]
 """
     # print(formatted_code)
-    response = await client.chat.completions.create(
+    return dict(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -102,6 +101,9 @@ You are an advanced blockchain token security analyst. Analyze this token securi
         reasoning_format="hidden"
     )
 
-    data = response.choices[0].message.content
-    # print(data)
-    return data
\ No newline at end of file
+async def token_analyst_agent(token_report: str):
+    return await get_llm_gateway().complete(**build_token_analyst_agent_request(token_report))
+
+def token_analyst_agent_stream(token_report: str):
+    """Async iterator over the tokens of the token assessment as they arrive"""
+    return get_llm_gateway().stream(**build_token_analyst_agent_request(token_report))
@@ -1,10 +1,9 @@
-from groq import AsyncGroq
+from utils.llm_gateway import get_llm_gateway
 import asyncio
 import json
 
-async def wallet_analyst_agent(wallet_report):
-    client = AsyncGroq()
-    
+def build_wallet_analyst_agent_request(wallet_report):
+    """Chat completion parameters for wallet_analyst_agent"""
     user_prompt = f"""
 You are an advanced blockchain threat intelligence analyst. Analyze this wallet security report and provide a comprehensive assessment.
 
@@ -125,7 +124,7 @@ Provide complete markdown response.
 ```
 """
     # print(formatted_code)
-    response = await client.chat.completions.create(
+    return dict(
         model="deepseek-r1-distill-llama-70b",
         messages=[
             {
@@ -136,6 +135,9 @@ Provide complete markdown response.
         reasoning_format="hidden"
     )
 
-    data = response.choices[0].message.content
-    # print(data)
-    return data
\ No newline at end of file
+async def wallet_analyst_agent(wallet_report):
+    return await get_llm_gateway().complete(**build_wallet_analyst_agent_request(wallet_report))
+
+def wallet_analyst_agent_stream(wallet_report):
+    """Async iterator over the tokens of the wallet assessment as they arrive"""
+    return get_llm_gateway().stream(**build_wallet_analyst_agent_request(wallet_report))
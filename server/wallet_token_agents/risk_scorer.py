@@ -0,0 +1,122 @@
+import math
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List
+from utils.risk_features import WalletRiskFeatures, TokenRiskFeatures, WALLET_FLAGS, TOKEN_FLAGS, UNKNOWN
+
+# Levels in increasing order of risk
+RISK_LEVELS = ("low", "medium", "high", "critical")
+LEVEL_THRESHOLDS = ((0.9, "critical"), (0.6, "high"), (0.25, "medium"))  # Minimum score for each level
+
+TAX_HIGH = 0.10       # Buy/sell tax treated as a red flag
+TAX_CRITICAL = 0.50   # Sell tax that makes exiting the position pointless
+MAX_UNKNOWN_SHARE = 0.5  # Above this share of unreported flags a clean result is not trusted
+
+# Per-flag weights, combined as a noisy-OR: score = 1 - prod(1 - weight) over raised flags.
+# A single weight >= 0.9 is enough for "critical" on its own.
+WALLET_WEIGHTS = {
+    "sanctioned": 0.99, "stealing_attack": 0.95, "phishing_activities": 0.95, "cybercrime": 0.9,
+    "money_laundering": 0.9, "blackmail_activities": 0.9, "financial_crime": 0.85,
+    "honeypot_related_address": 0.8, "darkweb_transactions": 0.75, "mixer": 0.7,
+    "malicious_mining_activities": 0.6, "fake_token": 0.6, "fake_standard_interface": 0.5,
+    "fake_kyc": 0.4, "blacklist_doubt": 0.35, "gas_abuse": 0.2, "reinit": 0.2,
+}
+MALICIOUS_CONTRACT_WEIGHT = 0.8
+
+TOKEN_WEIGHTS = {
+    "is_honeypot": 0.99, "is_airdrop_scam": 0.95, "fake_token": 0.95, "cannot_sell_all": 0.8,
+    "honeypot_with_same_creator": 0.7, "owner_change_balance": 0.7, "hidden_owner": 0.65,
+    "can_take_back_ownership": 0.6, "selfdestruct": 0.6, "cannot_buy": 0.5,
+    "personal_slippage_modifiable": 0.4, "slippage_modifiable": 0.35, "transfer_pausable": 0.3,
+    "is_blacklisted": 0.3, "is_mintable": 0.25, "trading_cooldown": 0.2, "external_call": 0.2,
+    "is_proxy": 0.15, "anti_whale_modifiable": 0.1,
+}
+CLOSED_SOURCE_WEIGHT = 0.4
+TAX_HIGH_WEIGHT = 0.5
+TAX_CRITICAL_WEIGHT = 0.95
+
+@dataclass(slots=True)
+class RiskAssessment:
+    """Outcome of the rule-based scorer; ambiguous results should go to the LLM analyst"""
+    level: str
+    score: float
+    reasons: List[str] = field(default_factory=list)
+    ambiguous: bool = False
+
+    def to_dict(self):
+        return {"risk_level": self.level, "risk_score": round(self.score, 4),
+                "reasons": self.reasons, "ambiguous": self.ambiguous}
+
+def risk_level(score: float) -> str:
+    for threshold, level in LEVEL_THRESHOLDS:
+        if score >= threshold:
+            return level
+    return "low"
+
+def combine(weights, reasons, unknown_share):
+    """Noisy-OR of the triggered rule weights; medium scores and mostly-unreported data are ambiguous"""
+    score = 1 - math.prod(1 - weight for weight in weights)
+    level = risk_level(score)
+    ambiguous = level == "medium" or (level == "low" and unknown_share > MAX_UNKNOWN_SHARE)
+    return RiskAssessment(level=level, score=score, reasons=reasons, ambiguous=ambiguous)
+
+def assess_wallet(features: WalletRiskFeatures) -> RiskAssessment:
+    weights, reasons = [], []
+    for flag in features.raised_flags():
+        weights.append(WALLET_WEIGHTS.get(flag, 0.5))
+        reasons.append(flag)
+    if features.malicious_contracts_created > 0:
+        weights.append(MALICIOUS_CONTRACT_WEIGHT)
+        reasons.append(f"created {features.malicious_contracts_created} malicious contracts")
+    unknown = sum(getattr(features, flag) == UNKNOWN for flag in WALLET_FLAGS) / len(WALLET_FLAGS)
+    return combine(weights, reasons, unknown)
+
+def assess_token(features: TokenRiskFeatures) -> RiskAssessment:
+    weights, reasons = [], []
+    for flag in features.raised_flags():
+        if flag in TOKEN_WEIGHTS:
+            weights.append(TOKEN_WEIGHTS[flag])
+            reasons.append(flag)
+    if features.is_open_source == 0:
+        weights.append(CLOSED_SOURCE_WEIGHT)
+        reasons.append("contract source not verified")
+    for name in ("buy_tax", "sell_tax"):
+        tax = getattr(features, name)
+        if name == "sell_tax" and tax >= TAX_CRITICAL:
+            weights.append(TAX_CRITICAL_WEIGHT)
+            reasons.append(f"{name} {tax:.0%}")
+        elif tax >= TAX_HIGH:
+            weights.append(TAX_HIGH_WEIGHT)
+            reasons.append(f"{name} {tax:.0%}")
+    unknown = sum(getattr(features, flag) == UNKNOWN for flag in TOKEN_FLAGS) / len(TOKEN_FLAGS)
+    assessment = combine(weights, reasons, unknown)
+    if features.trust_list == 1 and assessment.level != "critical":
+        # GoPlus-trusted tokens (major stablecoins, wrapped assets) keep their flags as reasons only
+        assessment.level, assessment.ambiguous = "low", False
+    return assessment
+
+def score_token_records(records: np.ndarray) -> np.ndarray:
+    """Vectorized token score over TOKEN_RECORD_DTYPE records (same rules as assess_token, without trust_list)"""
+    survival = np.ones(len(records))
+    for flag, weight in TOKEN_WEIGHTS.items():
+        survival *= np.where(records[flag] == 1, 1 - weight, 1.0)
+    survival *= np.where(records["is_open_source"] == 0, 1 - CLOSED_SOURCE_WEIGHT, 1.0)
+    sell_tax = np.nan_to_num(records["sell_tax"], nan=0.0)
+    buy_tax = np.nan_to_num(records["buy_tax"], nan=0.0)
+    survival *= np.where(sell_tax >= TAX_CRITICAL, 1 - TAX_CRITICAL_WEIGHT,
+                         np.where(sell_tax >= TAX_HIGH, 1 - TAX_HIGH_WEIGHT, 1.0))
+    survival *= np.where(buy_tax >= TAX_HIGH, 1 - TAX_HIGH_WEIGHT, 1.0)
+    return 1 - survival
+
+def score_wallet_records(records: np.ndarray) -> np.ndarray:
+    """Vectorized wallet score over WALLET_RECORD_DTYPE records (same rules as assess_wallet)"""
+    survival = np.ones(len(records))
+    for flag, weight in WALLET_WEIGHTS.items():
+        survival *= np.where(records[flag] == 1, 1 - weight, 1.0)
+    survival *= np.where(records["malicious_contracts_created"] > 0, 1 - MALICIOUS_CONTRACT_WEIGHT, 1.0)
+    return 1 - survival
+
+def format_assessment(assessment: RiskAssessment) -> str:
+    """One-line summary appended to the analyst prompt"""
+    reasons = ", ".join(assessment.reasons) or "no risk flags raised"
+    return f"Rule-based pre-assessment: {assessment.level} (score {assessment.score:.2f}); {reasons}"